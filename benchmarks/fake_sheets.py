@@ -0,0 +1,289 @@
+"""In-memory stand-in for the parts of gspread the app uses.
+
+The fake keeps the grid in Python lists, counts every API call and can
+sleep for a configurable time per call to simulate network latency.
+:func:`install` patches ``gspread.authorize`` and the service account
+loader so ``streamlit_app.py`` runs unchanged against it.
+"""
+
+import hashlib
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, timedelta
+from unittest import mock
+
+import gspread
+from google.oauth2 import service_account
+from gspread.utils import a1_range_to_grid_range, a1_to_rowcol, numericise
+
+HEADERS = ['ID', 'Title', 'Date', 'Time', 'Location', 'Category', 'Notes', 'Created', 'Version']
+CATEGORIES = ['Dining', 'Activity', 'Café', 'Travel', 'Stay', 'Special', 'Shopping']
+
+
+def make_plans(count, start=date(2025, 12, 17), days=16, seed=0):
+    """Header row plus ``count`` plausible plan rows spread over the trip"""
+    rng = random.Random(seed)
+    rows = [list(HEADERS)]
+    for i in range(count):
+        day = start + timedelta(days=rng.randrange(days))
+        rows.append([
+            str(100000 + i),
+            f"Plan {i} {rng.choice(['dinner', 'museum', 'walk', 'train', 'market'])}",
+            day.isoformat(),
+            f"{rng.randrange(7, 23):02d}:{rng.choice(['00', '15', '30', '45'])}",
+            f"Place {rng.randrange(500)}",
+            rng.choice(CATEGORIES),
+            f"Remember item {i}" if rng.random() < 0.5 else '',
+            "2025-11-01 10:00:00",
+            1,
+        ])
+    return rows
+
+
+class FakeSheetsBackend:
+    """Shared call log and latency settings for one fake spreadsheet"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, name):
+        with self.lock:
+            self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def total_calls(self):
+        with self.lock:
+            return sum(self.calls.values())
+
+
+class FakeWorksheet:
+    """A worksheet whose cells live in a list of rows"""
+
+    def __init__(self, rows, backend=None, title="Plans", sheet_id=0):
+        self.rows = [list(row) for row in rows]
+        self.backend = backend or FakeSheetsBackend()
+        self.title = title
+        self.id = sheet_id
+        self.spreadsheet = None
+        self._lock = threading.RLock()
+
+    # -- helpers ----------------------------------------------------------
+
+    @property
+    def col_count(self):
+        return max(26, max((len(row) for row in self.rows), default=0))
+
+    @property
+    def row_count(self):
+        return max(1000, len(self.rows))
+
+    def _cell(self, row, col):
+        cells = self.rows[row] if row < len(self.rows) else []
+        return cells[col] if col < len(cells) else ''
+
+    def _set(self, row, col, value):
+        while len(self.rows) <= row:
+            self.rows.append([])
+        cells = self.rows[row]
+        while len(cells) <= col:
+            cells.append('')
+        cells[col] = value
+
+    def _range(self, name):
+        """Formatted values of an A1 range, trimmed like the Sheets API does"""
+        grid = a1_range_to_grid_range(name)
+        r0, c0 = grid.get('startRowIndex', 0), grid.get('startColumnIndex', 0)
+        r1 = grid.get('endRowIndex', len(self.rows))
+        c1 = grid.get('endColumnIndex', self.col_count)
+        out = []
+        for r in range(r0, min(r1, len(self.rows))):
+            values = [str(self._cell(r, c)) for c in range(c0, c1)]
+            while values and values[-1] == '':
+                values.pop()
+            out.append(values)
+        while out and not out[-1]:
+            out.pop()
+        return out
+
+    # -- read API -----------------------------------------------------------
+
+    def get_all_values(self, **kwargs):
+        self.backend.record('get_all_values')
+        with self._lock:
+            return [[str(v) for v in row] for row in self.rows]
+
+    def get_all_records(self, numericise_ignore=None, **kwargs):
+        self.backend.record('get_all_records')
+        with self._lock:
+            headers = [str(h) for h in self.rows[0]] if self.rows else []
+            keep_strings = numericise_ignore == ['all']
+            records = []
+            for row in self.rows[1:]:
+                values = [str(self._cell_of(row, i)) for i in range(len(headers))]
+                if not keep_strings:
+                    values = [numericise(v, empty2zero=False, default_blank='') for v in values]
+                records.append(dict(zip(headers, values)))
+            return records
+
+    @staticmethod
+    def _cell_of(row, i):
+        return row[i] if i < len(row) else ''
+
+    def row_values(self, row, **kwargs):
+        self.backend.record('row_values')
+        with self._lock:
+            values = [str(v) for v in self.rows[row - 1]] if row <= len(self.rows) else []
+            while values and values[-1] == '':
+                values.pop()
+            return values
+
+    def col_values(self, col, **kwargs):
+        self.backend.record('col_values')
+        with self._lock:
+            values = [str(self._cell(r, col - 1)) for r in range(len(self.rows))]
+            while values and values[-1] == '':
+                values.pop()
+            return values
+
+    def batch_get(self, ranges, **kwargs):
+        self.backend.record('batch_get')
+        with self._lock:
+            return [self._range(name) for name in ranges]
+
+    # -- write API ----------------------------------------------------------
+
+    def append_row(self, values, **kwargs):
+        self.backend.record('append_row')
+        with self._lock:
+            self.rows.append(list(values))
+
+    def append_rows(self, values, **kwargs):
+        self.backend.record('append_rows')
+        with self._lock:
+            self.rows.extend(list(row) for row in values)
+
+    def update_cell(self, row, col, value):
+        self.backend.record('update_cell')
+        with self._lock:
+            self._set(row - 1, col - 1, value)
+
+    def update(self, values, range_name='A1', **kwargs):
+        self.backend.record('update')
+        with self._lock:
+            self._write_block(range_name, values)
+
+    def _write_block(self, range_name, values):
+        row, col = a1_to_rowcol(range_name.split(':')[0])
+        for i, row_values in enumerate(values):
+            for j, value in enumerate(row_values):
+                self._set(row - 1 + i, col - 1 + j, value)
+
+    def batch_update(self, data, **kwargs):
+        self.backend.record('batch_update')
+        with self._lock:
+            for item in data:
+                self._write_block(item['range'], item['values'])
+
+    def delete_rows(self, start_index, end_index=None):
+        self.backend.record('delete_rows')
+        with self._lock:
+            del self.rows[start_index - 1:(end_index or start_index)]
+
+    def add_cols(self, count):
+        self.backend.record('add_cols')
+
+
+class FakeSpreadsheet:
+    """Holds one worksheet and applies structural ``batch_update`` bodies"""
+
+    def __init__(self, worksheet, title="Travel Planner Dec 2025"):
+        self.title = title
+        self.id = "fake-spreadsheet"
+        self.sheet1 = worksheet
+        self.worksheets_by_title = {worksheet.title: worksheet}
+        worksheet.spreadsheet = self
+
+    def worksheet(self, title):
+        self.sheet1.backend.record('worksheet')
+        try:
+            return self.worksheets_by_title[title]
+        except KeyError:
+            raise gspread.WorksheetNotFound(title) from None
+
+    def add_worksheet(self, title, rows=1000, cols=26, **kwargs):
+        self.sheet1.backend.record('add_worksheet')
+        worksheet = FakeWorksheet([], backend=self.sheet1.backend, title=title,
+                                  sheet_id=len(self.worksheets_by_title))
+        worksheet.spreadsheet = self
+        self.worksheets_by_title[title] = worksheet
+        return worksheet
+
+    def get_lastUpdateTime(self):
+        """Stands in for Drive's modifiedTime: changes whenever any cell does"""
+        self.sheet1.backend.record('get_lastUpdateTime')
+        return hashlib.sha256(repr([ws.rows for ws in self.worksheets_by_title.values()]).encode()).hexdigest()
+
+    def worksheets(self):
+        self.sheet1.backend.record('worksheets')
+        return list(self.worksheets_by_title.values())
+
+    def batch_update(self, body):
+        self.sheet1.backend.record('spreadsheet.batch_update')
+        by_id = {ws.id: ws for ws in self.worksheets_by_title.values()}
+        for request in body['requests']:
+            if 'updateCells' in request:
+                spec = request['updateCells']
+                ws = by_id[spec['start']['sheetId']]
+                with ws._lock:
+                    for i, row in enumerate(spec['rows']):
+                        for j, cell in enumerate(row['values']):
+                            ws._set(spec['start']['rowIndex'] + i, spec['start'].get('columnIndex', 0) + j,
+                                    _cell_value(cell))
+            elif 'deleteDimension' in request:
+                grid = request['deleteDimension']['range']
+                ws = by_id[grid['sheetId']]
+                with ws._lock:
+                    del ws.rows[grid['startIndex']:grid['endIndex']]
+            elif 'appendCells' in request:
+                spec = request['appendCells']
+                ws = by_id[spec['sheetId']]
+                with ws._lock:
+                    for row in spec['rows']:
+                        ws.rows.append([_cell_value(cell) for cell in row['values']])
+            else:
+                raise NotImplementedError(next(iter(request)))
+        return {'replies': [{} for _ in body['requests']]}
+
+
+def _cell_value(cell):
+    value = cell.get('userEnteredValue', {})
+    return value.get('numberValue', value.get('stringValue', ''))
+
+
+class FakeClient:
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def open(self, title):
+        self.spreadsheet.sheet1.backend.record('open')
+        return self.spreadsheet
+
+    def create(self, title):
+        raise gspread.exceptions.GSpreadException("the fake cannot create spreadsheets")
+
+
+@contextmanager
+def install(worksheet):
+    """Route ``gspread.authorize`` to a client serving ``worksheet``"""
+    spreadsheet = worksheet.spreadsheet or FakeSpreadsheet(worksheet)
+    client = FakeClient(spreadsheet)
+    with mock.patch.object(gspread, 'authorize', lambda credentials: client), \
+            mock.patch.object(service_account.Credentials, 'from_service_account_info',
+                              classmethod(lambda cls, info, **kwargs: object())):
+        yield client
@@ -0,0 +1,67 @@
+"""Report what importing the app costs, from ``python -X importtime``.
+
+Imports ``streamlit_app.py`` (or another script) in a fresh interpreter
+with ``-X importtime`` and prints the wall time of the import, the time
+spent importing other modules and the slowest top-level packages by
+cumulative time. Run it a few times; the first run after
+installing packages also pays for writing bytecode.
+
+    python benchmarks/import_report.py
+    python benchmarks/import_report.py path/to/old_streamlit_app.py --top 15
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_times(script, runs=3):
+    """``(wall_us, total_us, {top_level_package: cumulative_us})``, best of ``runs``"""
+    script = Path(script).resolve()
+    code = (f"import sys, time; sys.path.insert(0, {str(script.parent)!r}); "
+            f"started = time.perf_counter(); import importlib; importlib.import_module({script.stem!r}); "
+            f"print(int((time.perf_counter() - started) * 1e6))")
+    best = None
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=script.parent,
+                                capture_output=True, text=True, env={**os.environ, "PYTHONWARNINGS": "ignore"})
+        packages = defaultdict(int)
+        total = 0
+        for line in result.stderr.splitlines():
+            match = LINE.match(line)
+            if not match or len(match.group(3)) != 1:
+                continue    # only imports made directly by the interpreter (depth 0)
+            cumulative, name = int(match.group(2)), match.group(4)
+            packages[name.split('.')[0]] += cumulative
+            total += cumulative
+        wall = int(result.stdout.split()[-1])
+        if best is None or wall < best[0]:
+            best = (wall, total, dict(packages))
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("script", nargs="?", default=ROOT / "streamlit_app.py")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    wall, total, packages = import_times(args.script, args.runs)
+    print(f"{'import of the app':<24} {wall / 1000:>8.1f} ms")
+    print(f"{'  of which imports':<24} {total / 1000:>8.1f} ms")
+    for name, us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<24} {us / 1000:>8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
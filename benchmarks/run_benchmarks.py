@@ -0,0 +1,239 @@
+"""Measure what a rerun of the app costs as the Plans sheet grows.
+
+Drives ``streamlit_app.py`` through Streamlit's ``AppTest`` against the
+in-memory fake in ``fake_sheets.py`` and records, for every scenario and
+sheet size: wall time of the rerun, Sheets API calls (including the ones
+the background sync makes for an edit), bytes of ForwardMsgs sent to the
+frontend and peak traced memory. Edits are counted until the background
+sync has drained and the page has refreshed once.
+
+    python benchmarks/run_benchmarks.py                   # compare to baseline.json
+    python benchmarks/run_benchmarks.py --update-baseline
+    python benchmarks/run_benchmarks.py --sizes 100 1000 --latency 0.1
+
+Peak memory comes from a second pass with tracemalloc running, so it
+doesn't inflate the timings; ``--no-memory`` skips that pass.
+
+Only API calls and bytes sent to the frontend gate the comparison: they
+don't depend on the machine. Wall times are reported as advisory, since
+a baseline recorded on one machine says little about another.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+from fake_sheets import FakeSheetsBackend, FakeWorksheet, install, make_plans
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "streamlit_app.py"
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# A scenario counts as a regression when it makes more API calls or sends
+# this much more to the frontend; getting this much slower is only reported
+TIME_TOLERANCE = 0.25
+BYTES_TOLERANCE = 0.10
+
+
+class _ForwardMsgMeter:
+    """Sums the size of the ForwardMsgs each script run produces"""
+
+    def __init__(self):
+        self.bytes = 0
+        self._original = LocalScriptRunner.forward_msgs
+
+    def __enter__(self):
+        meter, original = self, self._original
+
+        def forward_msgs(runner):
+            msgs = original(runner)
+            meter.bytes += sum(msg.ByteSize() for msg in msgs)
+            return msgs
+
+        LocalScriptRunner.forward_msgs = forward_msgs
+        return self
+
+    def __exit__(self, *exc):
+        LocalScriptRunner.forward_msgs = self._original
+
+
+def _pending_writes(data_dir):
+    path = Path(data_dir) / "pending_writes.sqlite3"
+    if not path.exists():
+        return 0
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT COUNT(*) FROM pending_writes WHERE status = 'pending'").fetchone()[0]
+
+
+def _wait_for_sync(data_dir, timeout=30.0):
+    deadline = time.time() + timeout
+    while _pending_writes(data_dir) and time.time() < deadline:
+        time.sleep(0.02)
+
+
+def _find(elements, **attrs):
+    for element in elements:
+        if all(getattr(element, name, None) == value for name, value in attrs.items()):
+            return element
+    raise LookupError(f"no element with {attrs}")
+
+
+# Labels of the app's tabs. AppTest doesn't send the open tab back to the
+# script, so every run sets it in session state.
+TIMELINE, LIST, MANAGE = "📅 Timeline View", "📋 List View", "➕ Add/Manage Plans"
+
+
+def _add_plan(at):
+    _find(at.text_input, label="Title *", value="").input("Benchmark dinner")
+    _find(at.button, label="✨ Add Plan").click()
+
+
+def _edit_plan(at):
+    edit_title = [t for t in at.text_input if t.label == "Title *" and t.value][0]
+    edit_title.input(edit_title.value + " (edited)")
+    _find(at.button, label="💾 Update Plan").click()
+
+
+def _delete_plan(at):
+    [b for b in at.button if (b.key or '').startswith("del_")][0].click()
+
+
+# (name, open tab, action before the rerun, whether it writes to the sheet)
+SCENARIOS = [
+    ("cold_load", TIMELINE, None, False),
+    ("warm_rerun", TIMELINE, None, False),
+    ("timeline_filter", TIMELINE,
+     lambda at: _find(at.multiselect, label="Filter by category").set_value(["Dining"]), False),
+    ("open_list_tab", LIST, None, False),
+    ("list_next_page", LIST, lambda at: _find(at.button, key="list_next").click(), False),
+    ("list_sort", LIST, lambda at: _find(at.selectbox, label="Sort by").select("Title (A–Z)"), False),
+    ("delete_plan", LIST, _delete_plan, True),
+    ("open_manage_tab", MANAGE, None, False),
+    ("add_plan", MANAGE, _add_plan, True),
+    ("edit_plan", MANAGE, _edit_plan, True),
+    ("rerun_after_writes", MANAGE, None, False),
+]
+
+
+def run_size(size, latency, trace_memory=False):
+    """Run every scenario against a fresh fake sheet of ``size`` plans"""
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    backend = FakeSheetsBackend(latency=latency)
+    worksheet = FakeWorksheet(make_plans(size), backend=backend)
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir, install(worksheet), _ForwardMsgMeter() as meter:
+        os.environ["PLANNER_DATA_DIR"] = data_dir
+        # the change watcher probes on a timer; keep it out of per-interaction counts
+        os.environ["PLANNER_WATCH_INTERVAL"] = "0"
+        at = AppTest.from_file(str(APP), default_timeout=600)
+        # a distinct secret per size gives each run its own cached connection
+        at.secrets["gcp_service_account"] = {"type": "service_account", "client_email": f"bench-{size}@example.com"}
+        for name, tab, action, writes in SCENARIOS:
+            at.session_state["plan_tabs"] = tab
+            if action is not None:
+                action(at)
+            calls_before, bytes_before = backend.total_calls(), meter.bytes
+            if trace_memory:
+                tracemalloc.start()
+            started = time.perf_counter()
+            at.run()
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+            if trace_memory:
+                tracemalloc.stop()
+            if writes:
+                # the page refresh the sync indicator triggers once it drains
+                _wait_for_sync(data_dir)
+                at.session_state["plan_tabs"] = tab
+                at.run()
+            if at.exception:
+                raise RuntimeError(f"{name} at {size} plans: {at.exception[0].value}")
+            results[name] = {
+                "seconds": round(elapsed, 4),
+                "api_calls": backend.total_calls() - calls_before,
+                "bytes_to_frontend": meter.bytes - bytes_before,
+                "peak_memory_bytes": peak,
+            }
+    return results
+
+
+def compare(current, baseline):
+    """Human-readable (regressions, slowdowns) of ``current`` against ``baseline``"""
+    problems, slower = [], []
+    for size, scenarios in current.items():
+        for name, now in scenarios.items():
+            before = baseline.get(size, {}).get(name)
+            if before is None:
+                continue
+            if now["seconds"] > before["seconds"] * (1 + TIME_TOLERANCE) and now["seconds"] - before["seconds"] > 0.05:
+                slower.append(f"{size} plans / {name}: {before['seconds']}s -> {now['seconds']}s")
+            if now["api_calls"] > before["api_calls"]:
+                problems.append(f"{size} plans / {name}: {before['api_calls']} -> {now['api_calls']} API calls")
+            if now["bytes_to_frontend"] > before["bytes_to_frontend"] * (1 + BYTES_TOLERANCE):
+                problems.append(f"{size} plans / {name}: {before['bytes_to_frontend']} -> "
+                                f"{now['bytes_to_frontend']} bytes to frontend")
+    return problems, slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per Sheets API call")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (faster, no peak memory)")
+    parser.add_argument("--update-baseline", action="store_true", help=f"write results to {BASELINE.name}")
+    parser.add_argument("--output", type=Path, help="also write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if not args.update_baseline and BASELINE.exists():
+        baseline = json.loads(BASELINE.read_text())
+        if baseline.get("latency") != args.latency:
+            print(f"baseline was recorded with --latency {baseline.get('latency')}, not {args.latency}; "
+                  "rerun with that latency or --update-baseline", file=sys.stderr)
+            return 2
+
+    os.chdir(ROOT)
+    current = {}
+    for size in args.sizes:
+        current[str(size)] = run_size(size, args.latency)
+        if not args.no_memory:
+            traced = run_size(size, args.latency, trace_memory=True)
+            for name, result in traced.items():
+                current[str(size)][name]["peak_memory_bytes"] = result["peak_memory_bytes"]
+        for name, result in current[str(size)].items():
+            memory = result["peak_memory_bytes"]
+            print(f"{size:>6} plans  {name:<20} {result['seconds']:>8.3f}s  {result['api_calls']:>3} calls  "
+                  f"{result['bytes_to_frontend']:>9} B out"
+                  + (f"  {memory / 1e6:>7.1f} MB peak" if memory is not None else ""))
+
+    report = {"latency": args.latency, "results": current}
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.update_baseline:
+        BASELINE.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"baseline written to {BASELINE}")
+        return 0
+    if baseline is None:
+        print("no baseline yet; run with --update-baseline to record one")
+        return 0
+    problems, slower = compare(current, baseline["results"])
+    for note in slower:
+        print(f"slower (advisory, machine-dependent) {note}")
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
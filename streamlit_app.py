@@ -1,11 +1,44 @@
 import streamlit as st
-import gspread
-from google.oauth2.service_account import Credentials
-import pandas as pd
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, timedelta, timezone
 import json
 import base64
+import functools
+import hashlib
+import importlib
+import io
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import uuid
+from bisect import bisect_left
+from collections import Counter, OrderedDict, defaultdict, deque, namedtuple
+from concurrent.futures import Future
+from contextlib import contextmanager
+from html import escape
 from pathlib import Path
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+class _LazyModule:
+    """A module that is only imported when one of its attributes is used.
+
+    pandas and gspread (with google-auth) take most of a cold start to
+    import; deferring them lets the header and skeleton paint first.
+    """
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(importlib.import_module(self._name), attr)
+
+
+pd = _LazyModule("pandas")
+gspread = _LazyModule("gspread")
 
 # Page configuration
 st.set_page_config(
@@ -15,29 +48,62 @@ st.set_page_config(
 )
 
 # Custom CSS
-def _img_to_datauri(path: Path):
+# Background photos are resized and recompressed once per source file and
+# written under static/, which Streamlit serves when static serving is on
+# (see .streamlit/config.toml). Otherwise the small re-encoded image is
+# inlined as a data URI.
+STATIC_DIR = Path(__file__).parent / "static"
+
+
+@st.cache_resource(show_spinner=False)
+def _background_image_url(path, mtime_ns, max_side):
+    from PIL import Image, ImageOps, features
+
+    data = Path(path).read_bytes()
+    digest = hashlib.sha256(data + str(max_side).encode()).hexdigest()[:16]
+    fmt, ext = ('WEBP', 'webp') if features.check('webp') else ('JPEG', 'jpeg')
+    name = f"{Path(path).stem}-{digest}.{ext}"
+    out = STATIC_DIR / "generated" / name
+    if not out.exists():
+        img = ImageOps.exif_transpose(Image.open(io.BytesIO(data))).convert('RGB')
+        img.thumbnail((max_side, max_side))
+        buf = io.BytesIO()
+        img.save(buf, fmt, quality=75, optimize=True)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out.with_suffix('.tmp')
+        tmp.write_bytes(buf.getvalue())
+        tmp.replace(out)
+    if st.get_option("server.enableStaticServing"):
+        return f"app/static/generated/{name}"
+    return f"data:image/{ext};base64,{base64.b64encode(out.read_bytes()).decode()}"
+
+
+def background_image_url(path: Path, max_side=1920):
+    """URL of a display-sized copy of ``path``, or None if it can't be read"""
     try:
-        with open(path, "rb") as f:
-            data = base64.b64encode(f.read()).decode()
-        ext = path.suffix.lstrip('.').lower()
-        return f"data:image/{ext};base64,{data}"
+        return _background_image_url(str(path), path.stat().st_mtime_ns, max_side)
     except Exception:
         return None
 
-# prepare background images (use local files picture1.jpg and picture2.jpg if present)
-bg1 = _img_to_datauri(Path("picture1.jpg")) or ''
-bg2 = _img_to_datauri(Path("picture2.jpg")) or ''
-
 # Always show the full image as the page background and make content
 # containers transparent so the image is visible.
 content_bg = 'rgba(255,228,241,0.9)'
 
-st.markdown(f"""
+
+@st.cache_resource(show_spinner=False)
+def page_style(bg1, bg2):
+    """The page stylesheet (and background layer), built once per process"""
+    style = f"""
 <style>
+    /* The page background is referenced once and reused through a variable */
+    :root {{
+        {'--page-bg: url("' + bg1 + '");' if bg1 else ''}
+    }}
+
     /* Apply the page background to Streamlit's app container */
     section[data-testid="stAppViewContainer"] {{
         background: linear-gradient(180deg, #ffd6ec 0%, #ffc1e0 50%, #ffb0d6 100%); /* stronger pink gradient */
-        {'background-image: url("' + bg1 + '");' if bg1 else ''}
+        {'background-image: var(--page-bg);' if bg1 else ''}
         background-blend-mode: overlay;
         background-size: cover;
         background-attachment: fixed;
@@ -78,6 +144,21 @@ st.markdown(f"""
         box-shadow: 0 2px 8px rgba(0,0,0,0.06);
     }}
 
+    /* Placeholder cards shown while the plans load */
+    .skeleton {{
+        height: 6rem;
+        border-radius: 1rem;
+        background: linear-gradient(90deg, rgba(255,255,255,0.55) 25%, rgba(255,255,255,0.85) 50%, rgba(255,255,255,0.55) 75%);
+        background-size: 200% 100%;
+        animation: skeleton-shimmer 1.2s ease-in-out infinite;
+        margin-bottom: 1rem;
+    }}
+
+    @keyframes skeleton-shimmer {{
+        from {{ background-position: 200% 0; }}
+        to {{ background-position: -200% 0; }}
+    }}
+
     .category-badge {{
         display: inline-block;
         padding: 0.25rem 0.75rem;
@@ -87,85 +168,257 @@ st.markdown(f"""
         margin-right: 0.5rem;
     }}
 </style>
-""", unsafe_allow_html=True)
-
-# Insert a fixed full-screen <img> behind the app for pixel-perfect background
-if bg1:
-    st.markdown(
-        f"""
-        <style>
-            #page-bg-img {{
-                position: fixed;
-                inset: 0;
-                z-index: -9999;
-                width: 100%;
-                height: 100%;
-                object-fit: contain;
-                pointer-events: none;
-                opacity: 1;
-            }}
-            /* ensure the app content sits above the image */
-            section[data-testid="stAppViewContainer"] {{
-                position: relative;
-                z-index: 0;
-            }}
-        </style>
-        <img id="page-bg-img" src="{bg1}" alt="background" />
-        """,
-        unsafe_allow_html=True,
-    )
+"""
+    if bg1:
+        # Insert a fixed full-screen layer behind the app for pixel-perfect background
+        style += """
+<style>
+    #page-bg-img {
+        position: fixed;
+        inset: 0;
+        z-index: -9999;
+        width: 100%;
+        height: 100%;
+        background: var(--page-bg) center / contain no-repeat;
+        pointer-events: none;
+        opacity: 1;
+    }
+    /* ensure the app content sits above the image */
+    section[data-testid="stAppViewContainer"] {
+        position: relative;
+        z-index: 0;
+    }
+</style>
+<div id="page-bg-img"></div>
+"""
+    return style
+
+
+# prepare background images (use local files picture1.jpg and picture2.jpg if present)
+bg1 = background_image_url(Path("picture1.jpg")) or ''
+bg2 = background_image_url(Path("picture2.jpg"), max_side=1200) or ''
+st.markdown(page_style(bg1, bg2), unsafe_allow_html=True)
 
 # Google Sheets Setup
+# ``Version`` is bumped on every write made through the app; the local
+# mirror uses it to fetch only the rows that changed.
+PLAN_COLUMNS = ['ID', 'Title', 'Date', 'Time', 'Location', 'Category', 'Notes', 'Created', 'Version']
+# Plans as the app works with them (see typed_plans): Date and Time are one
+# ``When`` datetime, Category is categorical and Version an integer
+PLAN_FIELDS = ['ID', 'Title', 'When', 'Location', 'Category', 'Notes', 'Created', 'Version']
+# The Trips worksheet lists every trip and the worksheet holding its plans
+TRIP_COLUMNS = ['ID', 'Name', 'Start', 'End', 'Worksheet']
+
+# The spreadsheet holding the trip registry and one worksheet per trip
+SPREADSHEET_NAME = os.environ.get("PLANNER_SPREADSHEET", "Travel Planner Dec 2025")
+
 SCOPES = [
     'https://www.googleapis.com/auth/spreadsheets',
     'https://www.googleapis.com/auth/drive'
 ]
 
 
-def _sanitize_value(value):
-    """Convert common pandas/numpy types to native JSON-serializable Python types."""
-    if value is None:
-        return ""
-    try:
-        # pandas NA handling
-        if pd.isna(value):
-            return ""
-    except Exception:
-        pass
+# Performance instrumentation. Sections of a rerun and every Sheets API
+# call are timed; the debug panel (?debug=1 or PLANNER_DEBUG=1) shows the
+# breakdown and rolling percentiles, and PLANNER_METRICS_FILE appends one
+# JSON line per rerun.
+METRICS_WINDOW = 200
+METRICS_FILE = os.environ.get("PLANNER_METRICS_FILE")
 
-    # datetime/date formatting
-    try:
-        if hasattr(value, 'strftime'):
-            return value.strftime("%Y-%m-%d %H:%M:%S")
-    except Exception:
-        pass
 
-    # Try integer, then float, else fallback to string
-    try:
-        return int(value)
-    except Exception:
+class RerunTrace:
+    """Timings recorded while one script run (or fragment rerun) is executing"""
+
+    def __init__(self, fragment=None):
+        self.started = time.time()
+        self.fragment = fragment
+        self.sections = {}
+        self.api_calls = []
+        self.total = None
+
+    def to_dict(self):
+        return {
+            'ts': self.started,
+            'fragment': self.fragment,
+            'total_ms': round(self.total * 1000, 3) if self.total is not None else None,
+            'sections_ms': {name: round(sec * 1000, 3) for name, sec in self.sections.items()},
+            'api_calls': [{'name': name, 'ms': round(sec * 1000, 3), 'ok': ok}
+                          for name, sec, ok in self.api_calls],
+        }
+
+
+class Instrumentation:
+    """Process-wide timers and counters for reruns and Sheets API calls.
+
+    The trace of the rerun executing on the current thread collects section
+    timings and API calls; calls made outside a rerun (the sync worker and
+    the change watcher) are recorded under the ``background`` history only.
+    """
+
+    def __init__(self, export_path=None):
+        self.export_path = export_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._history = defaultdict(lambda: deque(maxlen=METRICS_WINDOW))
+        self.api_counts = defaultdict(int)
+        self.api_errors = defaultdict(int)
+
+    @property
+    def current(self):
+        return getattr(self._local, 'trace', None)
+
+    def _observe(self, key, seconds):
+        with self._lock:
+            self._history[key].append(seconds)
+
+    @contextmanager
+    def rerun(self, fragment=None):
+        """Trace one script run; exported even when it ends in st.rerun()"""
+        trace = RerunTrace(fragment)
+        self._local.trace = trace
+        started = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            trace.total = time.perf_counter() - started
+            self._local.trace = None
+            self._observe('rerun', trace.total)
+            if self.export_path:
+                with self._lock, open(self.export_path, 'a') as f:
+                    f.write(json.dumps(trace.to_dict()) + "\n")
+
+    @contextmanager
+    def section(self, name):
+        """Time a section of the page"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            trace = self.current
+            if trace is not None:
+                trace.sections[name] = trace.sections.get(name, 0.0) + elapsed
+            self._observe(f"section:{name}", elapsed)
+
+    @contextmanager
+    def api_call(self, name):
+        """Time and count one Sheets API call"""
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            elapsed = time.perf_counter() - started
+            trace = self.current
+            with self._lock:
+                self.api_counts[name] += 1
+                if not ok:
+                    self.api_errors[name] += 1
+            if trace is not None:
+                trace.api_calls.append((name, elapsed, ok))
+            self._observe(f"api:{name}", elapsed)
+            if trace is None:
+                self._observe("api:background", elapsed)
+
+    def percentiles(self):
+        """``{key: (count, p50, p90, p99)}`` in seconds over the rolling window"""
+        with self._lock:
+            history = {key: sorted(values) for key, values in self._history.items() if values}
+        result = {}
+        for key, values in history.items():
+            pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+            result[key] = (len(values), pick(0.5), pick(0.9), pick(0.99))
+        return result
+
+
+@st.cache_resource(show_spinner=False)
+def get_metrics():
+    """The process-wide :class:`Instrumentation`"""
+    return Instrumentation(METRICS_FILE)
+
+
+def traced(fragment):
+    """Give a fragment's own reruns a trace, as :func:`main` does for full runs.
+
+    Streamlit reruns only the fragment's function then, so without this its
+    sections and Sheets calls would go unrecorded (or count as background).
+    """
+    @functools.wraps(fragment)
+    def run(*args, **kwargs):
+        metrics = get_metrics()
+        if metrics.current is not None:
+            return fragment(*args, **kwargs)
+        with metrics.rerun(fragment.__name__) as trace:
+            result = fragment(*args, **kwargs)
+        if debug_panel_enabled():
+            # the sidebar panel is outside the fragment and can't be updated
+            st.caption(f"⏱️ {fragment.__name__} rerun: {trace.total * 1000:.0f} ms, "
+                       f"{len(trace.api_calls)} Sheets API call(s)")
+        return result
+    return run
+
+
+def debug_panel_enabled():
+    flag = st.query_params.get("debug", os.environ.get("PLANNER_DEBUG", ""))
+    return str(flag).lower() in ("1", "true", "yes")
+
+
+def render_debug_panel(metrics, trace):
+    """Per-rerun breakdown and rolling percentiles in the sidebar"""
+    with st.sidebar:
+        st.subheader("⏱️ Performance")
+        elapsed = time.time() - trace.started
+        st.caption(f"This rerun: {elapsed * 1000:.0f} ms, {len(trace.api_calls)} Sheets API call(s)")
+        rows = [f"| {name} | {sec * 1000:.1f} |" for name, sec in trace.sections.items()]
+        st.markdown("| Section | ms |\n| --- | ---: |\n" + "\n".join(rows))
+        if trace.api_calls:
+            rows = [f"| {name} | {sec * 1000:.1f} | {'✓' if ok else '✗'} |" for name, sec, ok in trace.api_calls]
+            st.markdown("| API call | ms | ok |\n| --- | ---: | :-: |\n" + "\n".join(rows))
+
+        st.markdown(f"**Last {METRICS_WINDOW} samples**")
+        rows = [
+            f"| {key} | {count} | {p50 * 1000:.1f} | {p90 * 1000:.1f} | {p99 * 1000:.1f} |"
+            for key, (count, p50, p90, p99) in sorted(metrics.percentiles().items())
+        ]
+        st.markdown("| Timer | n | p50 ms | p90 ms | p99 ms |\n| --- | ---: | ---: | ---: | ---: |\n"
+                    + "\n".join(rows))
+        totals = ", ".join(f"{name}: {count}" + (f" ({metrics.api_errors[name]} failed)" if metrics.api_errors[name] else "")
+                           for name, count in sorted(metrics.api_counts.items()))
+        st.caption(f"API calls since start — {totals or 'none'}")
+        if metrics.export_path:
+            st.caption(f"Exporting reruns to `{metrics.export_path}`")
+
+
+def _load_service_account_info():
+    """Read the service account info from Streamlit secrets as a plain dict"""
+    creds_dict = st.secrets["gcp_service_account"]
+    # Allow secrets to be provided either as a parsed TOML table (dict)
+    # or as a JSON string (common when pasting the whole JSON into
+    # `.streamlit/secrets.toml`). If it's a string, parse it.
+    if isinstance(creds_dict, str):
         try:
-            return float(value)
-        except Exception:
-            return str(value)
+            creds_dict = json.loads(creds_dict)
+        except Exception as ex:
+            # Provide a helpful error to the user in Streamlit UI
+            st.error("Could not parse gcp_service_account JSON from Streamlit secrets: %s" % ex)
+            return None
+    return dict(creds_dict)
 
 
-def connect_to_gsheet():
+def connect_to_gsheet(creds_dict=None):
     """Connect to Google Sheets using service account credentials"""
     try:
-        # Load credentials from Streamlit secrets
-        creds_dict = st.secrets["gcp_service_account"]
-        # Allow secrets to be provided either as a parsed TOML table (dict)
-        # or as a JSON string (common when pasting the whole JSON into
-        # `.streamlit/secrets.toml`). If it's a string, parse it.
-        if isinstance(creds_dict, str):
-            try:
-                creds_dict = json.loads(creds_dict)
-            except Exception as ex:
-                # Provide a helpful error to the user in Streamlit UI
-                st.error("Could not parse gcp_service_account JSON from Streamlit secrets: %s" % ex)
+        if creds_dict is None:
+            # Load credentials from Streamlit secrets
+            creds_dict = _load_service_account_info()
+            if creds_dict is None:
                 return None
+        from google.oauth2.service_account import Credentials
+
         creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
+        # The authorized session refreshes the access token on its own when
+        # it expires, so the client can be kept for the life of the process.
         client = gspread.authorize(creds)
         return client
     except Exception as e:
@@ -173,7 +426,271 @@ def connect_to_gsheet():
         st.info("Please set up your Google Cloud service account credentials in Streamlit secrets.")
         return None
 
-def get_or_create_sheet(client, spreadsheet_name="Travel Planner Dec 2025"):
+
+# Google Sheets allows 60 read and 60 write requests per minute per user
+# (the service account). Calls beyond that wait for the bucket to refill;
+# rate-limited reads and server errors on reads are retried with backoff.
+SHEETS_READS_PER_MINUTE = int(os.environ.get("PLANNER_READS_PER_MINUTE", "60"))
+SHEETS_WRITES_PER_MINUTE = int(os.environ.get("PLANNER_WRITES_PER_MINUTE", "60"))
+SHEETS_QUOTA_WAIT = 5.0      # longest a call waits for a token
+SHEETS_MAX_RETRIES = 4
+SHEETS_RETRY_BASE = 1.0      # seconds; doubled per retry
+SHEETS_RETRY_MAX = 16.0
+SHEETS_RETRY_BUDGET = 20.0   # total time a call may spend backing off
+SHEETS_READ_METHODS = frozenset({
+    'get', 'get_values', 'get_all_values', 'get_all_records', 'row_values', 'col_values',
+    'batch_get', 'acell', 'cell', 'get_lastUpdateTime',
+})
+
+
+class QuotaExhausted(Exception):
+    """Raised when a Sheets call cannot get a slot within ``SHEETS_QUOTA_WAIT``"""
+
+
+class TokenBucket:
+    """Allow ``per_minute`` calls per minute, in bursts of up to ``capacity``"""
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or max(1, per_minute // 2)
+        self.tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout=None):
+        """Take a token, waiting up to ``timeout`` seconds; False if none came"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def drain(self):
+        """Empty the bucket after the API reported the quota as used up"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0.0)
+
+
+class SheetQuota:
+    """Read and write buckets shared by every connection using one account"""
+
+    def __init__(self, reads_per_minute=SHEETS_READS_PER_MINUTE, writes_per_minute=SHEETS_WRITES_PER_MINUTE):
+        self.read = TokenBucket(reads_per_minute)
+        self.write = TokenBucket(writes_per_minute)
+
+
+@st.cache_resource(show_spinner=False)
+def get_quota(creds_key):
+    """The process-wide :class:`SheetQuota` of a service account"""
+    return SheetQuota()
+
+
+def _is_throttled(exc):
+    """Whether a failed Sheets call hit a rate limit"""
+    return isinstance(exc, QuotaExhausted) or (
+        isinstance(exc, gspread.exceptions.APIError) and exc.code == 429)
+
+
+def _is_reconnectable(exc):
+    """Whether a failed Sheets call is worth retrying on a fresh connection"""
+    from google.auth.exceptions import RefreshError, TransportError
+    import requests
+
+    if isinstance(exc, gspread.exceptions.APIError):
+        return exc.code in (401, 403) or exc.code >= 500
+    return isinstance(exc, (RefreshError, TransportError, requests.exceptions.ConnectionError))
+
+
+class SheetConnection:
+    """Process-wide handle on the authorized gspread client and worksheet.
+
+    Worksheet methods are proxied through :meth:`call`, so the connection
+    can be passed anywhere a worksheet is expected. Every call takes a token
+    from the account's read or write bucket, and identical reads already in
+    flight, from any session, share one request. A call that fails with an
+    auth or transport error drops the cached handles, reconnects and is
+    retried once; rate-limited calls and server errors on reads are retried
+    with jittered exponential backoff.
+    """
+
+    def __init__(self, creds_info, spreadsheet_name, worksheet_name="Plans", creds_key="", metrics=None,
+                 quota=None, columns=PLAN_COLUMNS, writes=None):
+        self._creds_info = creds_info
+        self.metrics = metrics or Instrumentation()
+        self.quota = quota or SheetQuota()
+        self.writes = writes if writes is not None else Counter()
+        self.spreadsheet_name = spreadsheet_name
+        self.worksheet_name = worksheet_name
+        self.columns = list(columns)
+        self.spreadsheet_key = f"{creds_key}:{spreadsheet_name}"
+        self.cache_key = f"{self.spreadsheet_key}:{worksheet_name}"
+        # local state on disk outlives the credentials: rotating the key keeps it
+        self.storage_key = f"{spreadsheet_name}:{worksheet_name}"
+        self.data_version = 0
+        self._lock = threading.RLock()
+        self._client = None
+        self._worksheet = None
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+
+    def bump_version(self):
+        """Mark cached sheet contents stale after this app wrote to the sheet"""
+        with self._lock:
+            self.data_version += 1
+        # any sheet's write changes the spreadsheet's modified time
+        self.writes[self.spreadsheet_key] += 1
+
+    def get_client(self):
+        """Return the authorized client, authorizing on first use"""
+        with self._lock:
+            if self._client is None:
+                with self.metrics.api_call("authorize"):
+                    self._client = connect_to_gsheet(self._creds_info)
+            return self._client
+
+    def connect(self):
+        """Return the worksheet handle, opening it on first use"""
+        with self._lock:
+            if self._worksheet is None:
+                client = self.get_client()
+                if client is None:
+                    return None
+                with self.metrics.api_call("open_worksheet"):
+                    self._worksheet = get_or_create_sheet(client, self.spreadsheet_name, self.worksheet_name,
+                                                          self.columns)
+            return self._worksheet
+
+    def reset(self):
+        """Forget the client and worksheet so the next call reconnects"""
+        with self._lock:
+            self._client = None
+            self._worksheet = None
+
+    def run(self, fn, name="call"):
+        """Call ``fn(worksheet)`` within the quota, retrying transient errors.
+
+        ``name`` is the worksheet method (or a label for the request) and
+        decides whether the read or the write bucket is charged. Writes are
+        only retried on 429s, which the API rejects before applying them;
+        other failed writes drop the connection for the next call and raise.
+        """
+        read = name in SHEETS_READ_METHODS
+        bucket = self.quota.read if read else self.quota.write
+        deadline = time.monotonic() + SHEETS_RETRY_BUDGET
+        reconnected = False
+        retries = 0
+        while True:
+            if not bucket.acquire(timeout=SHEETS_QUOTA_WAIT):
+                raise QuotaExhausted(f"Google Sheets {'read' if read else 'write'} quota is used up, try again in a minute")
+            worksheet = self.connect()
+            if worksheet is None:
+                raise ConnectionError("Google Sheets connection is not available")
+            try:
+                with self.metrics.api_call(name):
+                    return fn(worksheet)
+            except Exception as e:
+                throttled = _is_throttled(e)
+                server_error = isinstance(e, gspread.exceptions.APIError) and e.code >= 500
+                if throttled or (read and server_error):
+                    if throttled:
+                        bucket.drain()
+                    delay = min(SHEETS_RETRY_MAX, SHEETS_RETRY_BASE * 2 ** retries) * random.uniform(0.5, 1.5)
+                    retries += 1
+                    if retries > SHEETS_MAX_RETRIES or time.monotonic() + delay > deadline:
+                        raise
+                    time.sleep(delay)
+                    continue
+                if reconnected or not _is_reconnectable(e):
+                    raise
+                self.reset()
+                if not read:
+                    # the write may have been applied before it failed: don't send it twice,
+                    # the caller retries it after checking the sheet (e.g. the write-behind queue)
+                    raise
+                reconnected = True
+
+    def call(self, method, *args, **kwargs):
+        """Invoke a worksheet method through :meth:`run`.
+
+        Reads identical to one already in flight wait for it and get the
+        same result instead of spending another request.
+        """
+        request = lambda worksheet: getattr(worksheet, method)(*args, **kwargs)
+        if method not in SHEETS_READ_METHODS:
+            return self.run(request, name=method)
+        key = (method, repr(args), repr(sorted(kwargs.items())))
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            future.set_result(self.run(request, name=method))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+        return future.result()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        worksheet = self.connect()
+        attr = getattr(worksheet, name)
+        if not callable(attr):
+            return attr
+        return lambda *args, **kwargs: self.call(name, *args, **kwargs)
+
+
+@st.cache_resource(show_spinner=False)
+def get_write_counts():
+    """How often this process wrote to each spreadsheet, shared by its connections"""
+    return Counter()
+
+
+@st.cache_resource(show_spinner=False)
+def _get_connection(creds_key, spreadsheet_name, worksheet_name, columns, _creds_info):
+    return SheetConnection(_creds_info, spreadsheet_name, worksheet_name, creds_key=creds_key,
+                           metrics=get_metrics(), quota=get_quota(creds_key), columns=columns,
+                           writes=get_write_counts())
+
+
+def get_connection(worksheet_name="Plans", columns=PLAN_COLUMNS, spreadsheet_name=SPREADSHEET_NAME):
+    """Get the shared connection for this service account and worksheet.
+
+    Connections are cached per process, keyed by a hash of the
+    ``gcp_service_account`` secret and the spreadsheet and worksheet names,
+    so reruns and other sessions reuse the same authorized client and
+    worksheet. A worksheet that doesn't exist yet is created with
+    ``columns`` as its header row.
+    """
+    try:
+        creds_info = _load_service_account_info()
+    except Exception as e:
+        st.error(f"Error connecting to Google Sheets: {e}")
+        st.info("Please set up your Google Cloud service account credentials in Streamlit secrets.")
+        return None
+    if creds_info is None:
+        return None
+    creds_key = hashlib.sha256(json.dumps(creds_info, sort_keys=True, default=str).encode()).hexdigest()
+    return _get_connection(creds_key, spreadsheet_name, worksheet_name, tuple(columns), creds_info)
+
+def get_or_create_sheet(client, spreadsheet_name=SPREADSHEET_NAME, worksheet_name="Plans", columns=PLAN_COLUMNS):
     """Get existing spreadsheet or create new one"""
     try:
         spreadsheet = client.open(spreadsheet_name)
@@ -195,333 +712,2266 @@ def get_or_create_sheet(client, spreadsheet_name="Travel Planner Dec 2025"):
             return None
     
     try:
-        worksheet = spreadsheet.worksheet("Plans")
+        worksheet = spreadsheet.worksheet(worksheet_name)
     except gspread.WorksheetNotFound:
-        worksheet = spreadsheet.add_worksheet(title="Plans", rows=1000, cols=10)
-        # Add headers
-        headers = ['ID', 'Title', 'Date', 'Time', 'Location', 'Category', 'Notes', 'Created']
-        worksheet.append_row(headers)
-    
+        worksheet = spreadsheet.add_worksheet(title=worksheet_name, rows=1000, cols=10)
+        # Add headers; a new trip registry starts out listing the original trip
+        rows = [list(columns)]
+        if list(columns) == TRIP_COLUMNS:
+            rows.append(_trip_row(DEFAULT_TRIP))
+        worksheet.append_rows(rows, value_input_option='RAW')
+        return worksheet
+
+    _ensure_headers(worksheet, list(columns))
     return worksheet
 
-def load_data(worksheet):
-    """Load all data from Google Sheets"""
-    try:
-        data = worksheet.get_all_records()
-        if data:
-            df = pd.DataFrame(data)
-            df['Date'] = pd.to_datetime(df['Date']).dt.date
-            return df
-        return pd.DataFrame(columns=['ID', 'Title', 'Date', 'Time', 'Location', 'Category', 'Notes', 'Created'])
-    except Exception as e:
-        st.error(f"Error loading data: {e}")
-        return pd.DataFrame(columns=['ID', 'Title', 'Date', 'Time', 'Location', 'Category', 'Notes', 'Created'])
+def _ensure_headers(worksheet, columns=PLAN_COLUMNS):
+    """Add header cells for columns introduced after the sheet was created"""
+    headers = worksheet.row_values(1)
+    if headers == columns or headers != columns[:len(headers)]:
+        return
+    if worksheet.col_count < len(columns):
+        worksheet.add_cols(len(columns) - worksheet.col_count)
+    missing = columns[len(headers):]
+    worksheet.update([missing], gspread.utils.rowcol_to_a1(1, len(headers) + 1), raw=True)
 
-def add_trip(worksheet, trip_data):
-    """Add new trip to Google Sheets"""
-    try:
-        # sanitize values to native Python types (avoid numpy/pandas types)
-        safe_row = [_sanitize_value(v) for v in trip_data]
-        worksheet.append_row(safe_row)
-        return True
-    except Exception as e:
-        st.error(f"Error adding trip: {e}")
-        return False
+# How long plain reads are served from the local mirror before it is synced
+# again. Writes made through this app trigger a sync on the next read.
+DATA_CACHE_TTL = int(os.environ.get("PLANNER_CACHE_TTL", "60"))
 
-def update_trip(worksheet, row_num, trip_data):
-    """Update existing trip in Google Sheets"""
-    try:
-        # row_num is 1-indexed, +1 for header
-        for i, value in enumerate(trip_data):
-            v = _sanitize_value(value)
-            worksheet.update_cell(row_num + 2, i + 1, v)
-        return True
-    except Exception as e:
-        st.error(f"Error updating trip: {e}")
-        return False
 
-def delete_trip(worksheet, row_num):
-    """Delete trip from Google Sheets"""
-    try:
-        worksheet.delete_rows(row_num + 2)  # +2 for header and 1-indexing
-        return True
-    except Exception as e:
-        st.error(f"Error deleting trip: {e}")
-        return False
+def _invalidate_data(worksheet):
+    """Bump the shared data version so the next load re-syncs the sheet"""
+    worksheet.bump_version()
 
-# Categories with colors and emojis
-CATEGORIES = {
-    'Dining': {'color': '#f97316', 'emoji': '🍽️'},
-    'Activity': {'color': '#3b82f6', 'emoji': '📸'},
-    'Café': {'color': '#d97706', 'emoji': '☕'},
-    'Travel': {'color': '#8b5cf6', 'emoji': '✈️'},
-    'Stay': {'color': '#10b981', 'emoji': '🏠'},
-    'Special': {'color': '#ec4899', 'emoji': '💕'},
-    'Shopping': {'color': '#f59e0b', 'emoji': '🛍️'}
-}
+WriteResult = namedtuple('WriteResult', ['kind', 'ok', 'error'])
 
-# Trip dates
-TRIP_START = date(2025, 12, 17)
-TRIP_END = date(2026, 1, 1)
 
-def get_days_between():
-    """Get list of all days in the trip"""
-    days = []
-    current = TRIP_START
-    while current <= TRIP_END:
-        days.append(current)
-        current += timedelta(days=1)
-    return days
+def _cell_data(value):
+    """Wrap a sanitized value as Sheets CellData (stored as-is, like RAW input)"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {'userEnteredValue': {'numberValue': value}}
+    return {'userEnteredValue': {'stringValue': str(value)}}
 
-def main():
-    # Header
-    st.markdown("""
-    <div class="main-header">
-        <h1>💕 Our Adventure Together</h1>
-        <p style="font-size: 1.2rem; margin-top: 0.5rem;">Dec 17, 2025 - Jan 1, 2026 • 16 magical days</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Connect to Google Sheets
-    client = connect_to_gsheet()
-    
-    if not client:
-        st.warning("⚠️ Google Sheets connection not configured. Please add your service account credentials to Streamlit secrets.")
-        st.info("""
-        **Setup Instructions:**
-        1. Create a Google Cloud Project
-        2. Enable Google Sheets API and Google Drive API
-        3. Create a Service Account and download the JSON key
-        4. Add the JSON content to Streamlit secrets as 'gcp_service_account'
-        5. Share your Google Sheet with the service account email
-        """)
-        return
-    
-    worksheet = get_or_create_sheet(client)
-    if not worksheet:
-        st.error("Could not obtain a Google Sheet. See the instructions above to resolve Drive quota or share an existing sheet with the service account.")
-        return
 
-    # Load data
-    df = load_data(worksheet)
-    
-    # Stats (compact)
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        st.markdown(f"""
-        <div class="stat-card">
-            <h2 style="color: #ec4899; margin: 0;">📅 {len(df)}</h2>
-            <p style="margin: 0.5rem 0 0 0; color: #6b7280;">Total Plans</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        days = (TRIP_END - TRIP_START).days + 1
-        st.markdown(f"""
-        <div class="stat-card">
-            <h2 style="color: #ec4899; margin: 0;">❤️ {days}</h2>
-            <p style="margin: 0.5rem 0 0 0; color: #6b7280;">Days Together</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        days_planned = len(df['Date'].unique()) if len(df) > 0 else 0
-        st.markdown(f"""
-        <div class="stat-card">
-            <h2 style="color: #10b981; margin: 0;">✅ {days_planned}/{days}</h2>
-            <p style="margin: 0.5rem 0 0 0; color: #6b7280;">Days Planned</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    st.markdown("<br>", unsafe_allow_html=True)
-    
-    # Main tabs
-    tab1, tab2, tab3 = st.tabs(["📅 Timeline View", "📋 List View", "➕ Add/Manage Plans"])
-    
-    with tab1:
-        # Timeline view - simple top-to-bottom list (linear)
-        st.subheader("Timeline — Linear View")
+class WriteBatch:
+    """Collects sheet edits and sends them together.
 
-        # Category filter
-        filter_col1, _ = st.columns([3, 1])
-        with filter_col1:
-            selected_categories = st.multiselect(
-                "Filter by category",
-                options=list(CATEGORIES.keys()),
-                default=list(CATEGORIES.keys())
-            )
+    Rows are addressed by their 0-based position below the header row, as
+    of before the batch is applied. :meth:`flush` coalesces everything into a
+    single ``spreadsheets.batchUpdate`` call: updates first (last edit of a
+    row wins, edits of rows deleted in the same batch are dropped), then
+    deletes from the bottom up so earlier deletes don't shift later ones,
+    then appends.
+    """
+
+    def __init__(self, worksheet):
+        self.worksheet = worksheet
+        self._ops = []
+
+    def __len__(self):
+        return len(self._ops)
 
-        days = get_days_between()
+    def add(self, row_values):
+        self._ops.append({'kind': 'add', 'row_num': None, 'values': row_values})
 
-        for day in days:
-            day_trips = df[df['Date'] == day]
-            if len(selected_categories) > 0:
-                day_trips = day_trips[day_trips['Category'].isin(selected_categories)]
+    def update(self, row_num, row_values):
+        self._ops.append({'kind': 'update', 'row_num': row_num, 'values': row_values})
 
-            # Day header
-            st.markdown(f"<div style='margin: 0.5rem 0; padding: 0.5rem 0;'>"
-                        f"<strong>{day.strftime('%A, %B %d, %Y')}</strong> — Day {(day - TRIP_START).days + 1}"
-                        f"</div>", unsafe_allow_html=True)
+    def delete(self, row_num):
+        self._ops.append({'kind': 'delete', 'row_num': row_num, 'values': None})
 
-            if len(day_trips) == 0:
-                st.info("No plans for this day yet")
+    @staticmethod
+    def _build_requests(ops, sheet_id):
+        """Return (requests, settled) where settled maps op index to a local result"""
+        deleted = {op['row_num'] for op in ops if op['kind'] == 'delete'}
+        updates, deletes, appends, settled = {}, [], [], {}
+        for i, op in enumerate(ops):
+            if op['kind'] == 'update':
+                if op['row_num'] in deleted:
+                    settled[i] = WriteResult('update', False, "plan was deleted in the same batch")
+                    continue
+                # last edit of a row wins; earlier ones ride along with it
+                if op['row_num'] in updates:
+                    settled[updates[op['row_num']][0]] = None
+                updates[op['row_num']] = (i, op)
+            elif op['kind'] == 'delete':
+                if op['row_num'] in {d['row_num'] for _, d in deletes}:
+                    settled[i] = None
+                    continue
+                deletes.append((i, op))
             else:
-                day_trips = day_trips.sort_values('Time')
-                for idx, trip in day_trips.iterrows():
-                    cat = CATEGORIES.get(trip['Category'], CATEGORIES['Dining'])
-                    note_html = ''
-                    if trip.get('Notes'):
-                        note_html = f"<p style='margin: 0.5rem 0 0 0; color: #4b5563; font-style: italic;'>{trip['Notes']}</p>"
-                    location_html = f" | 📍 {trip['Location']}" if trip.get('Location') else ''
-
-                    col_main, col_action = st.columns([10, 1])
-                    with col_main:
-                        html = (
-                            f"<div class=\"trip-card\" style=\"border-left-color: {cat['color']};\">"
-                            f"<h3 style=\"margin: 0 0 0.25rem 0; color: #1f2937;\">{cat['emoji']} {trip['Title']}</h3>"
-                            f"<p style=\"margin: 0; color: #6b7280;\">🕐 {trip['Time']}{location_html}</p>"
-                            f"{note_html}"
-                            f"</div>"
-                        )
-                        st.markdown(html, unsafe_allow_html=True)
+                appends.append((i, op))
 
-                    with col_action:
-                        if st.button("🗑️", key=f"tl_del_{idx}"):
-                            if delete_trip(worksheet, idx):
-                                st.success("Deleted!")
-                                st.rerun()
-    
-    with tab2:
-        # List view - show all plans in table
-        st.subheader("All Plans")
-        
-        if len(df) == 0:
-            st.info("No plans added yet. Go to 'Add/Manage Plans' tab to create your first plan!")
-        else:
-            # Filter
-            filter_category = st.selectbox(
-                "Filter by category",
-                options=['All'] + list(CATEGORIES.keys())
+        requests = []
+        for row_num, (_, op) in sorted(updates.items()):
+            requests.append({'updateCells': {
+                'rows': [{'values': [_cell_data(v) for v in op['values']]}],
+                'fields': 'userEnteredValue',
+                # +1 skips the header row
+                'start': {'sheetId': sheet_id, 'rowIndex': row_num + 1, 'columnIndex': 0},
+            }})
+        for _, op in sorted(deletes, key=lambda item: item[1]['row_num'], reverse=True):
+            requests.append({'deleteDimension': {'range': {
+                'sheetId': sheet_id, 'dimension': 'ROWS',
+                'startIndex': op['row_num'] + 1, 'endIndex': op['row_num'] + 2,
+            }}})
+        if appends:
+            requests.append({'appendCells': {
+                'sheetId': sheet_id,
+                'rows': [{'values': [_cell_data(v) for v in op['values']]} for _, op in appends],
+                'fields': 'userEnteredValue',
+            }})
+        return requests, settled
+
+    def flush(self):
+        """Send the queued edits in one request; return a WriteResult per edit"""
+        if not self._ops:
+            return []
+        ops, self._ops = self._ops, []
+        settled, error = {}, None
+        try:
+            requests, settled = self._build_requests(ops, self.worksheet.id)
+            if requests:
+                self.worksheet.run(lambda ws: ws.spreadsheet.batch_update({'requests': requests}),
+                                   name="spreadsheet.batch_update")
+        except Exception as e:
+            error = e
+        finally:
+            _invalidate_data(self.worksheet)
+
+        results = []
+        for i, op in enumerate(ops):
+            if settled.get(i) is not None:
+                results.append(settled[i])
+            else:
+                # the batch is applied atomically: every edit shares its outcome
+                results.append(WriteResult(op['kind'], error is None, error))
+        return results
+
+
+def _row_text(values):
+    """A sheet row as strings, padded to ``PLAN_COLUMNS``, for comparing rows"""
+    text = ['' if v is None else v.isoformat() if isinstance(v, date) else str(v) for v in values]
+    return (text + [''] * len(PLAN_COLUMNS))[:len(PLAN_COLUMNS)]
+
+
+# Fields a merge may take from either side; the rest belong to the plan itself
+MERGE_COLUMNS = [c for c in PLAN_COLUMNS if c not in ('ID', 'Created', 'Version')]
+
+
+def merge_rows(base, mine, theirs):
+    """Three-way merge of a plan row.
+
+    Returns the merged row and the columns both sides changed, where
+    ``mine`` wins.
+    """
+    base, mine, theirs = _row_text(base), _row_text(mine), _row_text(theirs)
+    merged, clashes = list(theirs), []
+    for column in MERGE_COLUMNS:
+        i = PLAN_COLUMNS.index(column)
+        if mine[i] != base[i]:
+            if theirs[i] not in (base[i], mine[i]):
+                clashes.append(column)
+            merged[i] = mine[i]
+    return merged, clashes
+
+
+def new_plan_id():
+    """Collision-free ID for a new plan"""
+    return uuid.uuid4().hex
+
+
+class RowIndex:
+    """Maps plan IDs (the ``ID`` column) to their row in the sheet.
+
+    Positions are 0-based below the header row, as :class:`WriteBatch`
+    expects. The index is built from one ``batch_get`` of the ID and
+    Version columns and kept up to date in place after our own adds and
+    deletes. Before it is trusted for a write, the target rows are read back
+    with a single ``batch_get``, which both checks their IDs and gives the
+    writer their current ``Version``. It is only rebuilt when that check
+    fails, e.g. after someone edited the sheet directly.
+    """
+
+    def __init__(self, worksheet):
+        self.worksheet = worksheet
+        self._ids = None
+        self._rows = {}
+
+    def invalidate(self):
+        self._ids = None
+
+    def rebuild(self):
+        """Re-read the ID column; returns the current version of each plan"""
+        version = gspread.utils.rowcol_to_a1(1, PLAN_COLUMNS.index('Version') + 1).rstrip('1')
+        ids, versions = self.worksheet.batch_get(["A2:A", f"{version}2:{version}"])
+        self._ids = [cells[0] if cells else '' for cells in ids]
+        self._reindex()
+        versions = [_version(cells[0]) if cells else 0 for cells in versions]
+        return {pid: versions[position] if position < len(versions) else 0
+                for pid, position in self._rows.items()}
+
+    def _reindex(self):
+        self._rows = {}
+        for position, plan_id in enumerate(self._ids):
+            self._rows.setdefault(plan_id, position)
+
+    def peek(self, plan_ids):
+        """Positions already known for ``plan_ids``, without any sheet reads"""
+        return {pid: self._rows[pid] for pid in plan_ids if self._ids is not None and pid in self._rows}
+
+    def fetch(self, positions):
+        """Current cells of each target row, keyed by the ID expected there"""
+        last = gspread.utils.rowcol_to_a1(1, len(PLAN_COLUMNS)).rstrip('1')
+        items = sorted(positions.items(), key=lambda item: item[1])
+        values = self.worksheet.batch_get([f"A{position + 2}:{last}{position + 2}" for _, position in items])
+        return {pid: _row_text(v[0] if v else []) for (pid, _), v in zip(items, values)}
+
+    def read(self, plan_ids):
+        """``{plan_id: (position, version)}`` for those of ``plan_ids`` in the sheet"""
+        if not plan_ids:
+            return {}
+        if self._ids is not None:
+            found = self.peek(plan_ids)
+            rows = self.fetch(found) if found else {}
+            if len(found) == len(plan_ids) and all(rows[pid][0] == pid for pid in found):
+                column = PLAN_COLUMNS.index('Version')
+                return {pid: (found[pid], _version(rows[pid][column])) for pid in found}
+        versions = self.rebuild()
+        return {pid: (position, versions[pid]) for pid, position in self.peek(plan_ids).items()}
+
+    def apply(self, deleted=(), appended=()):
+        """Update the index in place after a successful batch"""
+        if self._ids is None:
+            return
+        for position in sorted(set(deleted), reverse=True):
+            del self._ids[position]
+        self._ids.extend(str(pid) for pid in appended)
+        self._reindex()
+
+
+# Local state (the pending-write queue) lives here; it must survive restarts
+DATA_DIR = Path(os.environ.get("PLANNER_DATA_DIR", ".planner"))
+
+SYNC_MAX_ATTEMPTS = 6
+SYNC_RETRY_BASE = 2.0     # seconds; doubled per failed attempt
+SYNC_RETRY_MAX = 300.0
+SYNC_SYNCED_SHOWN_FOR = 10.0
+SYNC_BATCH_MAX = 500      # edits per batchUpdate; bigger backlogs (imports) go in several
+
+
+class WriteBehindQueue:
+    """Durable queue of pending plan edits, synced by a background worker.
+
+    Edits are stored in a local SQLite file keyed by plan ID and applied
+    optimistically to the loaded data (see :func:`apply_pending`), so the
+    UI only pays for a local render. A daemon thread drains the queue
+    through a :class:`WriteBatch`, resolving plan IDs to sheet rows with a
+    :class:`RowIndex` right before each flush, and retries failed batches with exponential backoff
+    and jitter. Edits still failing after ``SYNC_MAX_ATTEMPTS`` stay in the
+    queue as failed until they are retried or discarded.
+
+    Updates and deletes carry the ``Version`` of the plan they were made
+    against and are only written while the sheet still holds that version
+    (compare-and-set); every update writes the next version. An edit whose
+    plan was changed by someone else in the meantime is held back as a
+    conflict, with the sheet's row, until it is rebased or discarded.
+    """
+
+    def __init__(self, worksheet, path):
+        self.worksheet = worksheet
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._key = worksheet.storage_key
+        self.index = RowIndex(worksheet)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._recently_synced = {}
+        with self._db() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS pending_writes ("
+                " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " sheet TEXT NOT NULL, kind TEXT NOT NULL, plan_id TEXT NOT NULL,"
+                " payload TEXT, status TEXT NOT NULL DEFAULT 'pending',"
+                " attempts INTEGER NOT NULL DEFAULT 0, next_attempt REAL NOT NULL DEFAULT 0,"
+                " error TEXT)"
             )
-            
-            display_df = df if filter_category == 'All' else df[df['Category'] == filter_category]
-            display_df = display_df.sort_values(['Date', 'Time'])
-            
-            # Display
-            for idx, trip in display_df.iterrows():
-                cat = CATEGORIES.get(trip['Category'], CATEGORIES['Dining'])
-                col1, col2 = st.columns([5, 1])
-                
-                with col1:
-                    location_html = f" | 📍 {trip['Location']}" if trip.get('Location') else ''
-                    note_html = f"<p style='margin: 0.5rem 0 0 0; color: #4b5563; font-style: italic;'>{trip['Notes']}</p>" if trip.get('Notes') else ''
-                    html = (
-                        f"<div class=\"trip-card\" style=\"border-left-color: {cat['color']};\">"
-                        f"<h3 style=\"margin: 0 0 0.5rem 0; color: #1f2937;\">{cat['emoji']} {trip['Title']}</h3>"
-                        f"<p style=\"margin: 0.25rem 0; color: #6b7280;\">📅 {trip['Date'].strftime('%b %d, %Y')} | 🕐 {trip['Time']}{location_html}</p>"
-                        f"{note_html}"
-                        f"</div>"
-                    )
-                    st.markdown(html, unsafe_allow_html=True)
-                
-                with col2:
-                    if st.button("🗑️ Delete", key=f"del_{idx}"):
-                        if delete_trip(worksheet, idx):
-                            st.success("Deleted!")
-                            st.rerun()
-    
-    with tab3:
-        st.subheader("Add New Plan")
-        
-        with st.form("add_trip_form"):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                title = st.text_input("Title *", placeholder="Dinner at Italian restaurant")
-                trip_date = st.date_input(
-                    "Date *",
-                    min_value=TRIP_START,
-                    max_value=TRIP_END,
-                    value=TRIP_START
-                )
+            columns = {row[1] for row in db.execute("PRAGMA table_info(pending_writes)")}
+            for column, kind in (('base_version', 'INTEGER'), ('base', 'TEXT'), ('remote', 'TEXT')):
+                if column not in columns:
+                    db.execute(f"ALTER TABLE pending_writes ADD COLUMN {column} {kind}")
+            # edits queued under the older key, which began with a SHA-256 of the credentials
+            db.execute(
+                "UPDATE pending_writes SET sheet = ? WHERE length(sheet) = ? AND substr(sheet, 65, 1) = ':'"
+                " AND substr(sheet, 66) = ?",
+                (self._key, len(self._key) + 65, self._key),
+            )
+        self._thread = threading.Thread(target=self._run, name="planner-sync", daemon=True)
+        self._thread.start()
+
+    def _db(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def enqueue(self, kind, plan_id, values=None, base_version=None, base=None):
+        """Record an add/update/delete of a plan and wake the worker.
+
+        ``base_version`` is the version of the plan the edit was made
+        against (``None`` skips the check) and ``base`` its row at the time,
+        used to merge with someone else's changes on a conflict.
+        """
+        with self._lock, self._db() as db:
+            db.execute(
+                "INSERT INTO pending_writes (sheet, kind, plan_id, payload, base_version, base)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (self._key, kind, str(plan_id), json.dumps(values) if values is not None else None,
+                 base_version, json.dumps(base) if base is not None else None),
+            )
+        self._wake.set()
+
+    def enqueue_adds(self, rows):
+        """Record many new plans (sheet rows) in one transaction and wake the worker once"""
+        with self._lock, self._db() as db:
+            db.executemany(
+                "INSERT INTO pending_writes (sheet, kind, plan_id, payload) VALUES (?, 'add', ?, ?)",
+                [(self._key, str(row[0]), json.dumps(row)) for row in rows],
+            )
+        self._wake.set()
+
+    def pending(self):
+        """All queued edits for this sheet, oldest first"""
+        with self._lock, self._db() as db:
+            rows = db.execute(
+                "SELECT seq, kind, plan_id, payload, status, attempts, next_attempt, error,"
+                " base_version, base, remote"
+                " FROM pending_writes WHERE sheet = ? ORDER BY seq",
+                (self._key,),
+            ).fetchall()
+        return [
+            {'seq': seq, 'kind': kind, 'plan_id': plan_id,
+             'values': json.loads(payload) if payload else None,
+             'status': status, 'attempts': attempts, 'next_attempt': next_attempt, 'error': error,
+             'base_version': base_version, 'base': json.loads(base) if base else None,
+             'remote': json.loads(remote) if remote else None}
+            for (seq, kind, plan_id, payload, status, attempts, next_attempt, error,
+                 base_version, base, remote) in rows
+        ]
+
+    def status_by_plan(self, ops=None):
+        """Map plan ID to 'syncing', 'failed', 'conflict' or (briefly after a sync) 'synced'"""
+        now = time.time()
+        status = {pid: 'synced' for pid, at in list(self._recently_synced.items())
+                  if now - at < SYNC_SYNCED_SHOWN_FOR}
+        for op in self.pending() if ops is None else ops:
+            if op['status'] == 'conflict':
+                status[op['plan_id']] = 'conflict'
+            elif status.get(op['plan_id']) == 'conflict':
+                continue
+            elif op['status'] == 'failed':
+                status[op['plan_id']] = 'failed'
+            elif status.get(op['plan_id']) != 'failed':
+                status[op['plan_id']] = 'syncing'
+        return status
+
+    def rebase(self, seq, values=None):
+        """Send a conflicting edit again on top of the sheet's current row.
+
+        ``values`` replaces the edit's row (e.g. a merge); the written
+        version becomes one past the sheet's.
+        """
+        ops = self.pending()
+        op = next(op for op in ops if op['seq'] == seq)
+        remote = op['remote']
+        column = PLAN_COLUMNS.index('Version')
+        version = _version(remote[column])
+        values = values if values is not None else op['values']
+        if values is not None:
+            values = list(values)
+            values[column] = version + 1
+        changes = [(values, version, remote, seq)]
+        # later edits of the plan were made on top of this one; replay them
+        # on the rebased row so they don't undo the other side's changes
+        old, new = op['values'][column] if op['values'] else None, values[column] if values else None
+        previous = values
+        for later in ops:
+            if later['seq'] <= seq or later['plan_id'] != op['plan_id'] or later['base_version'] != old:
+                continue
+            later_values = later['values']
+            if later_values is not None:
+                old = later_values[column]
+                if later['base'] and previous is not None:
+                    later_values, _ = merge_rows(later['base'], later_values, previous)
+                later_values = list(later_values)
+                later_values[column] = new + 1
+            changes.append((later_values, new, previous, later['seq']))
+            new = later_values[column] if later_values else None
+            previous = later_values
+        with self._lock, self._db() as db:
+            db.executemany(
+                "UPDATE pending_writes SET payload = ?, base_version = ?, base = ?, remote = NULL,"
+                " status = 'pending', attempts = 0, next_attempt = 0, error = NULL WHERE seq = ?",
+                [(json.dumps(v) if v is not None else None, base_version, json.dumps(base) if base else None, op_seq)
+                 for v, base_version, base, op_seq in changes],
+            )
+        self._wake.set()
+
+    def drop(self, seq):
+        """Give up a queued edit, and later ones of the same plan, keeping what is in the sheet"""
+        with self._lock, self._db() as db:
+            db.execute(
+                "DELETE FROM pending_writes WHERE seq >= ? AND sheet = ? AND plan_id ="
+                " (SELECT plan_id FROM pending_writes WHERE seq = ?)",
+                (seq, self._key, seq),
+            )
+        # pull the sheet's version of the plan back into the mirror
+        self.worksheet.bump_version()
+
+    def retry_failed(self):
+        with self._lock, self._db() as db:
+            db.execute(
+                "UPDATE pending_writes SET status = 'pending', attempts = 0, next_attempt = 0, error = NULL"
+                " WHERE sheet = ? AND status = 'failed'",
+                (self._key,),
+            )
+        self._wake.set()
+
+    def discard_failed(self):
+        with self._lock, self._db() as db:
+            db.execute("DELETE FROM pending_writes WHERE sheet = ? AND status = 'failed'", (self._key,))
+
+    def _run(self):
+        while True:
+            self._wake.wait(timeout=1.0)
+            self._wake.clear()
+            try:
+                self.sync_once()
+            except Exception:
+                # never let the worker die; the next pass will try again
+                time.sleep(SYNC_RETRY_BASE)
+
+    def sync_once(self):
+        """Send the due edits to the sheet in one batch and settle the queue"""
+        now = time.time()
+        due, blocked = [], set()
+        for op in self.pending():
+            if len(due) >= SYNC_BATCH_MAX:
+                # the rest goes in the next batch, right after this one
+                self._wake.set()
+                break
+            # keep a plan's edits in order: nothing after a not-yet-due edit
+            if op['status'] != 'pending' or op['next_attempt'] > now or op['plan_id'] in blocked:
+                blocked.add(op['plan_id'])
+                continue
+            due.append(op)
+        if not due:
+            return
+
+        edited = {op['plan_id'] for op in due if op['kind'] != 'add'}
+        added = {op['plan_id'] for op in due if op['kind'] == 'add'}
+        try:
+            current = self.index.read(edited)
+        except Exception as e:
+            # the sheet can't be read (offline, quota, 5xx): back off like a failed write
+            self._fail_lookup(due, e)
+            return
+        rows = {pid: position for pid, (position, _) in current.items()}
+        versions = {pid: version for pid, (_, version) in current.items()}
+        # an add that already landed (e.g. before a crash) becomes an update
+        rows.update(self.index.peek(added))
+
+        batch = WriteBatch(self.worksheet)
+        batched = []        # queue ops in the order they were put on the batch
+        owner = {}          # seq -> seq of the batched op whose outcome it shares
+        adds, done, dead, conflicts = {}, [], [], []
+        held = set()        # plans with a conflict; their later edits wait
+        # a plan deleted in this batch needn't be updated first: its earlier
+        # updates are folded into the delete and share its outcome
+        doomed = {op['plan_id']: op['seq'] for op in due if op['kind'] == 'delete'}
+        folded = defaultdict(list)
+        for op in due:
+            pid = op['plan_id']
+            if pid in held:
+                continue
+            if pid in versions and op['base_version'] is not None and op['base_version'] != versions[pid]:
+                try:
+                    remote = self.index.fetch({pid: rows[pid]})[pid]
+                except Exception as e:
+                    # nothing was sent yet
+                    self._fail_lookup(due, e)
+                    return
+                if op['kind'] == 'update' and _row_text(op['values']) == remote:
+                    # an earlier attempt landed even though it reported an error
+                    done.append(op)
+                    continue
+                # changed by someone else since this edit was made
+                conflicts.append((op, remote))
+                held.add(pid)
+                # updates folded into this delete were fine: send them after all
+                for update in folded.pop(pid, []):
+                    batch.update(rows[pid], update['values'])
+                    batched.append(update)
+                    owner[update['seq']] = update['seq']
+                continue
+            if op['kind'] == 'add' and pid not in rows:
+                adds[pid] = op
+                owner[op['seq']] = op['seq']
+            elif pid in adds:
+                # the plan isn't in the sheet yet: fold the edit into its add
+                add = adds[pid]
+                if op['kind'] == 'update':
+                    add['values'] = op['values']
+                    owner[op['seq']] = add['seq']
+                else:
+                    del adds[pid]
+                    into_add = [o for o in due if owner.get(o['seq']) == add['seq']]
+                    for o in into_add:
+                        del owner[o['seq']]
+                    done.extend(into_add + [op])
+            elif pid not in rows:
+                # already gone from the sheet: a delete is done, an edit can't land
+                (done if op['kind'] == 'delete' else dead).append(op)
+            else:
+                if op['kind'] == 'delete':
+                    batch.delete(rows[pid])
+                    versions.pop(pid, None)
+                    for update in folded.pop(pid, []):
+                        owner[update['seq']] = op['seq']
+                elif doomed.get(pid, 0) > op['seq']:
+                    folded[pid].append(op)
+                    versions[pid] = _version(op['values'][PLAN_COLUMNS.index('Version')])
+                    continue
+                else:
+                    batch.update(rows[pid], op['values'])
+                    versions[pid] = _version(op['values'][PLAN_COLUMNS.index('Version')])
+                batched.append(op)
+                owner[op['seq']] = op['seq']
+        for op in adds.values():
+            batch.add(op['values'])
+            batched.append(op)
+
+        results = dict(zip((op['seq'] for op in batched), batch.flush()))
+        if results and all(result.ok for result in results.values()):
+            self.index.apply(
+                deleted=[rows[op['plan_id']] for op in batched if op['kind'] == 'delete'],
+                appended=list(adds),
+            )
+        elif results:
+            # the sheet may or may not have changed; re-read IDs next time
+            self.index.invalidate()
+        synced, failed = [(op, None) for op in done], []
+        for op in due:
+            if op['seq'] not in owner:
+                continue
+            result = results.get(owner[op['seq']])
+            (synced if result is not None and result.ok else failed).append((op, result))
+        self._settle(synced, failed, dead, conflicts)
+
+    def _fail_lookup(self, due, error):
+        """Settle ``due`` as failed because the rows they target couldn't be read"""
+        self.index.invalidate()
+        self._settle([], [(op, WriteResult(op['kind'], False, error)) for op in due], [])
+
+    def _settle(self, synced, failed, dead, conflicts=()):
+        now = time.time()
+        with self._lock, self._db() as db:
+            for op, _ in synced:
+                db.execute("DELETE FROM pending_writes WHERE seq = ?", (op['seq'],))
+                self._recently_synced[op['plan_id']] = now
+            for op, result in failed:
+                attempts = op['attempts'] + 1
+                delay = min(SYNC_RETRY_MAX, SYNC_RETRY_BASE * 2 ** (attempts - 1))
+                delay *= random.uniform(0.5, 1.5)
+                db.execute(
+                    "UPDATE pending_writes SET attempts = ?, next_attempt = ?, status = ?, error = ?"
+                    " WHERE seq = ?",
+                    (attempts, now + delay, 'failed' if attempts >= SYNC_MAX_ATTEMPTS else 'pending',
+                     str(result.error) if result is not None else "not sent", op['seq']),
+                )
+            for op in dead:
+                db.execute(
+                    "UPDATE pending_writes SET status = 'failed', attempts = ?, error = ? WHERE seq = ?",
+                    (SYNC_MAX_ATTEMPTS, "plan no longer exists in the sheet", op['seq']),
+                )
+            for op, remote in conflicts:
+                db.execute(
+                    "UPDATE pending_writes SET status = 'conflict', remote = ?, error = ? WHERE seq = ?",
+                    (json.dumps(remote), "changed by someone else", op['seq']),
+                )
+
+
+@st.cache_resource(show_spinner=False)
+def _get_write_queue(cache_key, _worksheet):
+    return WriteBehindQueue(_worksheet, DATA_DIR / "pending_writes.sqlite3")
+
+
+def get_write_queue(worksheet):
+    """Get the shared write-behind queue for this sheet"""
+    return _get_write_queue(worksheet.cache_key, worksheet)
+
+
+# Rows whose Version didn't change are only re-read by a periodic full sync,
+# which picks up edits made directly in the spreadsheet.
+MIRROR_FULL_SYNC_INTERVAL = int(os.environ.get("PLANNER_FULL_SYNC_INTERVAL", "600"))
+MIRROR_RETRY_AFTER = 15
+MIRROR_QUOTA_RETRY_AFTER = 60   # the Sheets quota is per minute
+OFFLINE_MODE = os.environ.get("PLANNER_OFFLINE", "").lower() in ("1", "true", "yes")
+
+_MIRROR_FIELDS = [column.lower() for column in PLAN_COLUMNS]
+
+# Sort orders views can ask for: SQL for the mirror, and the equivalent
+# (columns, ascending) for re-sorting after pending edits are applied
+PLAN_ORDERS = {
+    'row': ("ORDER BY row", None),
+    'date': ("ORDER BY date, time, row", (['When'], True)),
+    'date_desc': ("ORDER BY date DESC, time DESC, row", (['When'], False)),
+    'title': ("ORDER BY title COLLATE NOCASE, date, time", (['Title', 'When'], True)),
+}
+
+
+def _iso_date(value):
+    """Normalize a sheet date cell to YYYY-MM-DD, or None if it isn't a date"""
+    value = str(value).strip()
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        pass
+    try:
+        return pd.to_datetime(value).date().isoformat()
+    except Exception:
+        return None
+
+
+def _version(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class PlanMirror:
+    """Local SQLite copy of a plans worksheet, synced incrementally.
+
+    The first sync, and one every ``MIRROR_FULL_SYNC_INTERVAL`` seconds,
+    reads the whole sheet. In between, a sync reads only the ``ID`` and
+    ``Version`` columns and fetches just the rows that are new or whose
+    version changed. Views query the mirror with indexed SQL; when the
+    Sheets API is down (or ``PLANNER_OFFLINE`` is set) it keeps serving the
+    rows from the last successful sync.
+    """
+
+    def __init__(self, worksheet, path):
+        self.worksheet = worksheet
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._key = worksheet.storage_key
+        self._lock = threading.Lock()
+        self.synced_version = None
+        self.revision = 0          # bumped whenever a sync changes the stored rows
+        self.full_synced_at = 0.0
+        self.confirmed_at = 0.0    # when the watcher last saw no change since the last sync
+        self.retry_at = 0.0
+        self.last_error = None
+        with self._db() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS plans ("
+                " sheet TEXT NOT NULL, id TEXT NOT NULL, title TEXT, date TEXT, time TEXT,"
+                " location TEXT, category TEXT, notes TEXT, created TEXT,"
+                " version INTEGER NOT NULL DEFAULT 0, row INTEGER NOT NULL,"
+                " PRIMARY KEY (sheet, id))"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS plans_by_date ON plans (sheet, date, time)")
+            db.execute("CREATE INDEX IF NOT EXISTS plans_by_category ON plans (sheet, category, date, time)")
+            db.execute("CREATE INDEX IF NOT EXISTS plans_by_title ON plans (sheet, title COLLATE NOCASE)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS mirror_state (sheet TEXT PRIMARY KEY, synced_at REAL NOT NULL)"
+            )
+            state = db.execute("SELECT synced_at FROM mirror_state WHERE sheet = ?", (self._key,)).fetchone()
+        # rows synced by an earlier process can be served while offline
+        self.synced_at = state[0] if state else None
+
+    def _db(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    @staticmethod
+    def _row_key(plan_id, position):
+        # rows without an ID still need a stable-enough primary key
+        return str(plan_id) if str(plan_id) != '' else f"#{position}"
+
+    def _record(self, values, position):
+        values = [str(v) for v in values] + [''] * (len(PLAN_COLUMNS) - len(values))
+        row = dict(zip(_MIRROR_FIELDS, values))
+        row['id'] = self._row_key(row['id'], position)
+        row['date'] = _iso_date(row['date'])
+        row['version'] = _version(row['version'])
+        return (self._key, *(row[field] for field in _MIRROR_FIELDS), position)
+
+    def _store(self, db, records):
+        db.executemany(
+            f"INSERT OR REPLACE INTO plans (sheet, {', '.join(_MIRROR_FIELDS)}, row)"
+            f" VALUES ({', '.join('?' * (len(_MIRROR_FIELDS) + 2))})",
+            records,
+        )
+
+    def _full_sync(self):
+        records = self.worksheet.get_all_records(numericise_ignore=['all'])
+        rows = [self._record([r.get(c, '') for c in PLAN_COLUMNS], i) for i, r in enumerate(records)]
+        with self._db() as db:
+            db.execute("DELETE FROM plans WHERE sheet = ?", (self._key,))
+            self._store(db, rows)
+        self.full_synced_at = time.time()
+        self.revision += 1
+
+    def _delta_sync(self):
+        version_col = gspread.utils.rowcol_to_a1(1, PLAN_COLUMNS.index('Version') + 1)[:-1]
+        last_col = gspread.utils.rowcol_to_a1(1, len(PLAN_COLUMNS))[:-1]
+        id_cells, version_cells = self.worksheet.batch_get(["A2:A", f"{version_col}2:{version_col}"])
+        ids = [cells[0] if cells else '' for cells in id_cells]
+        versions = [_version(cells[0]) if cells else 0 for cells in version_cells]
+        versions += [0] * (len(ids) - len(versions))
+
+        with self._db() as db:
+            known = {pid: (version, row) for pid, version, row in
+                     db.execute("SELECT id, version, row FROM plans WHERE sheet = ?", (self._key,))}
+        keys = [self._row_key(pid, i) for i, pid in enumerate(ids)]
+        changed = [i for i, key in enumerate(keys) if known.get(key, (None,))[0] != versions[i]]
+        moved = [(i, key) for i, key in enumerate(keys) if key in known and known[key][1] != i]
+        removed = set(known) - set(keys)
+        if len(changed) > max(50, len(ids) // 4):
+            # cheaper to read everything than to fetch this many single rows
+            return self._full_sync()
+
+        fetched = []
+        if changed:
+            ranges = [f"A{i + 2}:{last_col}{i + 2}" for i in changed]
+            fetched = self.worksheet.batch_get(ranges)
+        with self._db() as db:
+            db.executemany("DELETE FROM plans WHERE sheet = ? AND id = ?", [(self._key, k) for k in removed])
+            db.executemany("UPDATE plans SET row = ? WHERE sheet = ? AND id = ?",
+                           [(i, self._key, key) for i, key in moved])
+            self._store(db, [self._record(cells[0] if cells else [], i) for i, cells in zip(changed, fetched)])
+        if changed or moved or removed:
+            self.revision += 1
+
+    def sync(self, full=False):
+        """Bring the mirror up to date with the sheet; ``full`` re-reads all of it"""
+        with self._lock:
+            version = self.worksheet.data_version
+            if full or self.synced_at is None or time.time() - self.full_synced_at >= MIRROR_FULL_SYNC_INTERVAL:
+                self._full_sync()
+            else:
+                self._delta_sync()
+            self.synced_at = time.time()
+            self.synced_version = version
+            self.last_error = None
+            with self._db() as db:
+                db.execute("INSERT OR REPLACE INTO mirror_state (sheet, synced_at) VALUES (?, ?)",
+                           (self._key, self.synced_at))
+
+    def refresh(self, max_age=DATA_CACHE_TTL):
+        """Sync if the mirror is older than ``max_age`` or the app wrote to the sheet.
+
+        A check by the :class:`SheetWatcher` that found nothing new counts
+        as a sync here.
+        """
+        now = time.time()
+        if OFFLINE_MODE or now < self.retry_at:
+            return
+        fresh = (self.synced_version == self.worksheet.data_version
+                 and self.synced_at is not None and now - max(self.synced_at, self.confirmed_at) < max_age)
+        if fresh:
+            return
+        try:
+            self.sync()
+        except Exception as e:
+            self.last_error = e
+            self.retry_at = time.time() + (MIRROR_QUOTA_RETRY_AFTER if _is_throttled(e) else MIRROR_RETRY_AFTER)
+
+    def query(self, categories=None, start=None, end=None, ids=None, order='row'):
+        """Plans matching the filters as a DataFrame of sheet text"""
+        sql = [f"SELECT {', '.join(_MIRROR_FIELDS)} FROM plans WHERE sheet = ? AND date IS NOT NULL"]
+        params = [self._key]
+        if categories is not None:
+            sql.append(f"AND category IN ({', '.join('?' * len(categories))})")
+            params.extend(categories)
+        if start is not None:
+            sql.append("AND date >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            sql.append("AND date <= ?")
+            params.append(end.isoformat())
+        if ids is not None:
+            sql.append(f"AND id IN ({', '.join('?' * len(ids))})")
+            params.extend(ids)
+        sql.append(PLAN_ORDERS[order][0])
+        with self._db() as db:
+            rows = db.execute(" ".join(sql), params).fetchall()
+        return pd.DataFrame(rows, columns=PLAN_COLUMNS)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_mirror(cache_key, _worksheet):
+    return PlanMirror(_worksheet, DATA_DIR / "mirror.sqlite3")
+
+
+def load_mirror(worksheet):
+    """Get the local mirror of the sheet, syncing it first if it is stale"""
+    mirror = _get_mirror(worksheet.cache_key, worksheet)
+    mirror.refresh()
+    if mirror.last_error is not None and mirror.synced_at:
+        synced = datetime.fromtimestamp(mirror.synced_at).strftime('%b %d %H:%M')
+        if _is_throttled(mirror.last_error):
+            st.info(f"⏳ Google Sheets is busy right now. Showing plans as of {synced}; they will refresh shortly.")
+        else:
+            st.warning(f"📴 Google Sheets is unavailable ({mirror.last_error}). Showing plans as of {synced}.")
+    elif mirror.last_error is not None:
+        st.error(f"Error loading data: {mirror.last_error}")
+    elif OFFLINE_MODE:
+        st.info("📴 Offline mode: showing the local copy of your plans.")
+    return mirror
+
+
+# How often the shared watcher checks open sheets for edits made elsewhere
+# (e.g. directly in the spreadsheet); 0 turns it off
+WATCH_INTERVAL = float(os.environ.get("PLANNER_WATCH_INTERVAL", "20"))
+
+
+class SheetWatcher:
+    """Process-wide thread that brings in edits made outside this app.
+
+    Every ``WATCH_INTERVAL`` seconds it looks at the sheets sessions looked
+    at recently, once per spreadsheet: the spreadsheet's modified time from
+    Drive. While that stands still, nothing is read. When it moved, each
+    watched sheet is checked with a checksum of its ``ID`` and ``Version``
+    columns. Where those changed, or this app wrote to the sheet, a delta
+    sync brings the rows in. Where they didn't, the move is put down to this
+    app's writes to other sheets of the spreadsheet (other trips, the trip
+    registry) if there were any. Otherwise someone edited the spreadsheet
+    directly, which doesn't bump ``Version``, and the sheet is re-read in
+    full. An outside edit that lands in the same round as one of the app's
+    own writes elsewhere waits for the mirror's periodic full sync.
+
+    Where the Drive API isn't available, the checksum is the only probe.
+    All fetches go into the shared :class:`PlanMirror`, so Sheets reads
+    don't grow with the number of open sessions. Sessions notice the new
+    mirror revision through :func:`watch_for_changes`, which only looks at
+    local state.
+    """
+
+    def __init__(self, interval=WATCH_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._seen = {}             # cache key -> (mirror, when a session last looked at it)
+        self._spreadsheets = {}     # spreadsheet key -> (modified time, app writes) at its last move
+        self._checksums = {}        # cache key -> (ID/Version checksum, data version) at the last check
+        self._checksum_only = set()
+        self._thread = threading.Thread(target=self._run, name="planner-watcher", daemon=True)
+        self._thread.start()
+
+    def watch(self, mirror):
+        """Keep ``mirror`` up to date while sessions keep calling this"""
+        with self._lock:
+            self._seen[mirror.worksheet.cache_key] = (mirror, time.time())
+
+    def _active(self):
+        cutoff = time.time() - 3 * self.interval
+        with self._lock:
+            for key in [key for key, (_, seen) in self._seen.items() if seen < cutoff]:
+                del self._seen[key]
+                self._checksums.pop(key, None)
+            return [mirror for mirror, _ in self._seen.values()]
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.check(self._active())
+
+    def _modified_time(self, worksheet):
+        """The spreadsheet's modified time, or None where Drive can't tell"""
+        if worksheet.spreadsheet_key in self._checksum_only:
+            return None
+        try:
+            return worksheet.run(lambda ws: ws.spreadsheet.get_lastUpdateTime(), name="get_lastUpdateTime")
+        except (AttributeError, gspread.exceptions.APIError) as e:
+            if _is_throttled(e):
+                raise
+            self._checksum_only.add(worksheet.spreadsheet_key)
+            return None
+
+    @staticmethod
+    def _checksum(worksheet):
+        version_col = gspread.utils.rowcol_to_a1(1, PLAN_COLUMNS.index('Version') + 1)[:-1]
+        cells = worksheet.batch_get(["A2:A", f"{version_col}2:{version_col}"])
+        return hashlib.sha256(json.dumps(cells, default=str).encode()).hexdigest()
+
+    def check(self, mirrors):
+        """Probe the spreadsheets of ``mirrors`` once each and sync the mirrors that changed"""
+        by_spreadsheet = defaultdict(list)
+        for mirror in mirrors:
+            if not OFFLINE_MODE and time.time() >= mirror.retry_at:
+                by_spreadsheet[mirror.worksheet.spreadsheet_key].append(mirror)
+        for key, group in by_spreadsheet.items():
+            try:
+                self._check_spreadsheet(key, group)
+            except Exception:
+                # the mirrors report sync errors; a failed probe is retried next round
+                pass
+
+    def _check_spreadsheet(self, key, mirrors):
+        writes = mirrors[0].worksheet.writes[key]
+        probed_at = time.time()
+        stamp = self._modified_time(mirrors[0].worksheet)
+        previous, previous_writes = self._spreadsheets.get(key, (None, None))
+        if stamp is not None and stamp == previous:
+            unchecked = [m for m in mirrors if m.worksheet.cache_key not in self._checksums]
+            for mirror in mirrors:
+                if mirror not in unchecked:
+                    mirror.confirmed_at = probed_at
+            mirrors = unchecked
+        # the spreadsheet moved without this process writing to it: someone else did
+        outside = stamp is not None and previous is not None and writes == previous_writes
+        ok = True
+        for mirror in mirrors:
+            try:
+                self._check_sheet(mirror, probed_at, outside)
+            except Exception:
+                ok = False
+        if ok and stamp != previous:
+            # a write whose modified time shows up late still counts as ours next round
+            self._spreadsheets[key] = (stamp, writes)
+
+    def _check_sheet(self, mirror, probed_at, outside):
+        key = mirror.worksheet.cache_key
+        version = mirror.worksheet.data_version
+        checksum = self._checksum(mirror.worksheet)
+        previous, previous_version = self._checksums.get(key, (None, None))
+        if previous is not None and checksum == previous and version == previous_version and not outside:
+            mirror.confirmed_at = probed_at
+            return
+        try:
+            # a first check has nothing to compare with: sync so the two agree
+            mirror.sync(full=previous is not None and checksum == previous and version == previous_version)
+        except Exception as e:
+            mirror.last_error = e
+            mirror.retry_at = time.time() + (MIRROR_QUOTA_RETRY_AFTER if _is_throttled(e) else MIRROR_RETRY_AFTER)
+            raise
+        self._checksums[key] = (checksum, version)
+
+
+@st.cache_resource(show_spinner=False)
+def get_watcher():
+    return SheetWatcher()
+
+
+@st.fragment(run_every=WATCH_INTERVAL or None)
+@traced
+def watch_for_changes(mirror, revision):
+    """Rerun the page once the watcher has synced changes into ``mirror``.
+
+    Runs every ``WATCH_INTERVAL`` seconds in each session, without touching
+    the sheet; ``revision`` is the mirror revision the page was built from.
+    """
+    if WATCH_INTERVAL <= 0 or OFFLINE_MODE:
+        return
+    get_watcher().watch(mirror)
+    if mirror.revision != revision:
+        st.rerun(scope="app")
+
+
+def load_data(mirror, categories=None, start=None, end=None, order='row'):
+    """Load plans from the local mirror of Google Sheets"""
+    try:
+        return mirror.query(categories=categories, start=start, end=end, order=order)
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        return pd.DataFrame(columns=PLAN_COLUMNS)
+
+
+def typed_plans(df):
+    """Parse sheet text (``PLAN_COLUMNS``) into a typed plan frame (``PLAN_FIELDS``).
+
+    Rows without a valid date are dropped; a missing or malformed time
+    reads as midnight. Categories outside ``CATEGORIES`` are kept as extra
+    categories so they survive being written back.
+    """
+    dates = pd.to_datetime(df['Date'], format='%Y-%m-%d', errors='coerce')
+    clock = df['Time'].astype(str).str.extract(r'^\s*(\d{1,2}:\d{2})', expand=False)
+    times = pd.to_timedelta(clock + ':00', errors='coerce')
+    categories = df['Category'].fillna('').astype(str)
+    extra = sorted(set(categories.unique()) - set(CATEGORIES))
+    typed = pd.DataFrame({
+        'ID': df['ID'].astype(str),
+        'Title': df['Title'].fillna('').astype(str),
+        'When': dates + times.fillna(pd.Timedelta(0)),
+        'Location': df['Location'].fillna('').astype(str),
+        'Category': pd.Categorical(categories, categories=list(CATEGORIES) + extra),
+        'Notes': df['Notes'].fillna('').astype(str),
+        'Created': df['Created'].fillna('').astype(str),
+        'Version': pd.to_numeric(df['Version'], errors='coerce').fillna(0).astype('int64'),
+    }, index=df.index)
+    return typed[dates.notna()].reset_index(drop=True)
+
+
+def plan_rows(df):
+    """Sheet rows (lists in ``PLAN_COLUMNS`` order) for a typed plan frame"""
+    text = lambda column: df[column].fillna('').astype(str)
+    columns = [
+        df['ID'].astype(str), text('Title'),
+        df['When'].dt.strftime('%Y-%m-%d'), df['When'].dt.strftime('%H:%M'),
+        text('Location'), text('Category'), text('Notes'), text('Created'),
+        df['Version'].astype('int64'),
+    ]
+    return [list(row) for row in zip(*(column.tolist() for column in columns))]
+
+
+def plans_view(mirror, ops, categories=None, start=None, end=None, order='date'):
+    """Filtered, sorted, typed plans (see ``PLAN_ORDERS``) with queued edits applied"""
+    df = load_data(mirror, categories=categories, start=start, end=end, order=order)
+    if not ops:
+        return typed_plans(df)
+    # rows outside the filter may be moved into it by a pending edit
+    touched = {op['plan_id'] for op in ops} - set(df['ID'])
+    if touched:
+        df = pd.concat([df, mirror.query(ids=sorted(touched))], ignore_index=True)
+    df = apply_pending(df, ops)
+    if categories is not None:
+        df = df[df['Category'].isin(categories)]
+    # dates are ISO text here, so they compare in date order
+    if start is not None:
+        df = df[df['Date'] >= start.isoformat()]
+    if end is not None:
+        df = df[df['Date'] <= end.isoformat()]
+    return sort_plans(typed_plans(df), order)
+
+
+def sort_plans(df, order):
+    """A typed plan frame in one of the ``PLAN_ORDERS``, as the mirror would sort it"""
+    columns, ascending = PLAN_ORDERS[order][1]
+    df = df.sort_values(columns, ascending=ascending, kind='stable',
+                        key=lambda c: c.str.lower() if c.name == 'Title' else c)
+    return df.reset_index(drop=True)
+
+
+def apply_pending(df, ops):
+    """Overlay queued edits on the loaded sheet text so the UI shows them immediately"""
+    if not ops:
+        return df
+    df = df.copy()
+    ids = df['ID'].astype(str)
+    added = {}      # plans not in the loaded data yet, appended once at the end
+    for op in ops:
+        pid = op['plan_id']
+        if pid in added:
+            if op['kind'] == 'delete':
+                del added[pid]
+            elif op['kind'] == 'update':
+                added[pid] = op['values']
+            continue
+        match = ids == pid
+        if op['kind'] == 'delete':
+            df, ids = df[~match], ids[~match]
+        elif op['kind'] == 'update' and match.any():
+            for column, value in zip(PLAN_COLUMNS, op['values']):
+                df.loc[match, column] = value
+        elif op['kind'] == 'add' and not match.any():
+            added[pid] = op['values']
+    if added:
+        rows = [(values + [''] * len(PLAN_COLUMNS))[:len(PLAN_COLUMNS)] for values in added.values()]
+        df = pd.concat([df, pd.DataFrame(rows, columns=PLAN_COLUMNS)], ignore_index=True)
+    return df.reset_index(drop=True)
+
+
+def add_trip(queue, plan):
+    """Queue a new trip (``PLAN_FIELDS`` values) to be appended to Google Sheets"""
+    try:
+        row = plan_rows(pd.DataFrame([plan], columns=PLAN_FIELDS))[0]
+        queue.enqueue('add', row[0], row)
+        return True
+    except Exception as e:
+        st.error(f"Error adding trip: {e}")
+        return False
+
+def update_trip(queue, plan_id, plan, base_version=None, base=None):
+    """Queue an update of an existing trip (``PLAN_FIELDS`` values) in Google Sheets.
+
+    ``base_version`` and ``base`` are the version and sheet row the edit
+    started from; the update only lands while the sheet still has that
+    version.
+    """
+    try:
+        row = plan_rows(pd.DataFrame([plan], columns=PLAN_FIELDS))[0]
+        queue.enqueue('update', plan_id, row, base_version=base_version,
+                      base=_row_text(base) if base is not None else None)
+        return True
+    except Exception as e:
+        st.error(f"Error updating trip: {e}")
+        return False
+
+def delete_trip(queue, plan_id, base_version=None):
+    """Queue deletion of a trip from Google Sheets"""
+    try:
+        queue.enqueue('delete', plan_id, base_version=base_version)
+        return True
+    except Exception as e:
+        st.error(f"Error deleting trip: {e}")
+        return False
+
+def add_trips(queue, plans):
+    """Queue many new trips (a typed plan frame) to be appended to Google Sheets.
+
+    They are written in one local transaction; the sync worker sends them
+    in batches of up to ``SYNC_BATCH_MAX`` rows.
+    """
+    try:
+        queue.enqueue_adds(plan_rows(plans))
+        return True
+    except Exception as e:
+        st.error(f"Error importing trips: {e}")
+        return False
+
+
+# Bulk import and export. Files carry these columns (CSV headers match
+# case-insensitively); iCalendar events map SUMMARY, DTSTART, LOCATION,
+# CATEGORIES and DESCRIPTION onto them.
+IMPORT_COLUMNS = ['Title', 'Date', 'Time', 'Location', 'Category', 'Notes']
+IMPORT_DEFAULT_CATEGORY = 'Activity'    # for plans that come without one
+# Plans keep wall-clock times; UTC and zoned calendar times are moved to this
+# zone (the server's own when unset)
+LOCAL_TIMEZONE = os.environ.get("PLANNER_TIMEZONE") or None
+EXPORT_CHUNK = 1000     # rows formatted at a time when exporting
+
+ImportResult = namedtuple('ImportResult', ['plans', 'errors', 'duplicates'])
+
+_ICS_ESCAPE = re.compile(r"\\([\\;,nN])")
+_ICS_DATE = re.compile(r"(\d{4})(\d{2})(\d{2})(?:T(\d{2})(\d{2}))?")
+
+
+def _local_zone():
+    return ZoneInfo(LOCAL_TIMEZONE) if LOCAL_TIMEZONE else None
+
+
+def _ics_start(value, tzid=None):
+    """Date and time text of a DTSTART value.
+
+    UTC times (a trailing ``Z``) and times in a ``TZID`` zone are moved to
+    local time; floating times, and zones Python doesn't know (e.g. Windows
+    names), are taken as they are.
+    """
+    match = _ICS_DATE.match(value)
+    if not match:
+        return value, ''
+    year, month, day, hour, minute = match.groups()
+    if not hour:
+        return f"{year}-{month}-{day}", ''
+    start = datetime(int(year), int(month), int(day), int(hour), int(minute))
+    zone = None
+    if value.upper().endswith('Z'):
+        zone = timezone.utc
+    elif tzid:
+        try:
+            zone = ZoneInfo(tzid.strip('"'))
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    if zone is not None:
+        start = start.replace(tzinfo=zone).astimezone(_local_zone()).replace(tzinfo=None)
+    return start.strftime('%Y-%m-%d'), start.strftime('%H:%M')
+
+
+def _read_csv(file):
+    df = pd.read_csv(file, dtype=str, keep_default_na=False, skipinitialspace=True)
+    headers = {str(column).strip().casefold(): column for column in df.columns}
+    if 'title' not in headers or 'date' not in headers:
+        raise ValueError("the file needs Title and Date columns")
+    df = pd.DataFrame({column: df[headers[column.casefold()]] if column.casefold() in headers else ''
+                       for column in IMPORT_COLUMNS}, index=df.index)
+    # index rows by their line in the file, after the header
+    return df.set_axis(df.index + 2)
+
+
+def _ics_lines(stream):
+    """(line number, unfolded content line) pairs of an iCalendar stream"""
+    number, line = 0, None
+    for i, raw in enumerate(stream, start=1):
+        raw = raw.rstrip('\r\n')
+        if raw[:1] in (' ', '\t') and line is not None:
+            line += raw[1:]
+            continue
+        if line:
+            yield number, line
+        number, line = i, raw
+    if line:
+        yield number, line
+
+
+def _read_ics(stream):
+    events, event = {}, None
+    for number, line in _ics_lines(stream):
+        head, _, value = line.partition(':')
+        name, *params = head.split(';')
+        name = name.upper()
+        if name == 'BEGIN' and value.upper() == 'VEVENT':
+            event = dict.fromkeys(IMPORT_COLUMNS, '')
+            events[number] = event
+        elif name == 'END' and value.upper() == 'VEVENT':
+            event = None
+        elif event is not None:
+            text = _ICS_ESCAPE.sub(lambda m: '\n' if m.group(1) in 'nN' else m.group(1), value)
+            if name == 'SUMMARY':
+                event['Title'] = text
+            elif name == 'DTSTART':
+                params = dict(param.partition('=')[::2] for param in params)
+                tzid = next((v for k, v in params.items() if k.upper() == 'TZID'), None)
+                event['Date'], event['Time'] = _ics_start(value.strip(), tzid)
+            elif name == 'LOCATION':
+                event['Location'] = text
+            elif name == 'DESCRIPTION':
+                event['Notes'] = text
+            elif name == 'CATEGORIES':
+                event['Category'] = text.split(',')[0]
+    if not events:
+        raise ValueError("the file has no events")
+    return pd.DataFrame.from_dict(events, orient='index', columns=IMPORT_COLUMNS)
+
+
+def read_import(file):
+    """Plans in an uploaded CSV or iCalendar file.
+
+    Returns a frame of ``IMPORT_COLUMNS`` text indexed by the line each
+    plan starts on, for error messages.
+    """
+    file.seek(0)
+    if not file.name.lower().endswith('.ics'):
+        return _read_csv(file)
+    stream = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        return _read_ics(stream)
+    finally:
+        stream.detach()     # leave the upload open for the next rerun
+
+
+def validate_import(df, trip, existing, default_category=IMPORT_DEFAULT_CATEGORY):
+    """Check imported rows against ``CATEGORIES`` and the dates of ``trip``.
+
+    Rows without a category get ``default_category``. Returns an :data:`ImportResult`: a typed frame of the valid plans, with
+    new IDs, a list of (line, problem) pairs for the rest, and how many
+    plans were skipped because ``existing`` (or the file) already has a
+    plan with the same title, date and time.
+    """
+    df = df.fillna('').astype(str).apply(lambda column: column.str.strip())
+    dates = pd.to_datetime(df['Date'], errors='coerce', format='mixed').dt.normalize()
+    clock = pd.to_datetime(df['Time'].where(df['Time'] != '', '00:00'), errors='coerce', format='mixed')
+    categories = (df['Category'].where(df['Category'] != '', default_category)
+                  .str.casefold().map({name.casefold(): name for name in CATEGORIES}))
+    checks = [
+        (df['Title'] == '', "missing title"),
+        (dates.isna(), "unreadable date"),
+        (dates.notna() & ((dates.dt.date < trip.start) | (dates.dt.date > trip.end)),
+         f"date outside the trip ({trip.start.isoformat()} to {trip.end.isoformat()})"),
+        (clock.isna(), "unreadable time"),
+        (categories.isna(), f"category must be one of {', '.join(CATEGORIES)}"),
+    ]
+    problems = defaultdict(list)
+    for failed, message in checks:
+        for line in df.index[failed.to_numpy()]:
+            problems[line].append(message)
+    ok = ~df.index.isin(list(problems))
+
+    plans = pd.DataFrame({
+        'ID': [new_plan_id() for _ in range(ok.sum())],
+        'Title': df['Title'][ok].to_numpy(),
+        'When': (dates + (clock - clock.dt.normalize()))[ok].to_numpy(),
+        'Location': df['Location'][ok].to_numpy(),
+        'Category': pd.Categorical(categories[ok].to_numpy(), categories=list(CATEGORIES)),
+        'Notes': df['Notes'][ok].to_numpy(),
+        'Created': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'Version': 1,
+    })
+    keys = pd.MultiIndex.from_arrays([plans['Title'].str.casefold(), plans['When']])
+    seen = pd.MultiIndex.from_arrays([existing['Title'].str.casefold(), existing['When']])
+    duplicate = keys.isin(seen) | keys.duplicated()
+    errors = [(line, "; ".join(messages)) for line, messages in sorted(problems.items())]
+    return ImportResult(plans[~duplicate].reset_index(drop=True), errors, int(duplicate.sum()))
+
+
+def _export_text(df):
+    return pd.DataFrame({
+        'Title': df['Title'], 'Date': df['When'].dt.strftime('%Y-%m-%d'),
+        'Time': df['When'].dt.strftime('%H:%M'), 'Location': df['Location'],
+        'Category': df['Category'].astype(str), 'Notes': df['Notes'],
+    })
+
+
+def export_csv(df):
+    """CSV (``IMPORT_COLUMNS``) of a typed plan frame, formatted a chunk of rows at a time"""
+    out = io.StringIO()
+    out.write(",".join(IMPORT_COLUMNS) + "\n")
+    for first in range(0, len(df), EXPORT_CHUNK):
+        _export_text(df.iloc[first:first + EXPORT_CHUNK]).to_csv(out, header=False, index=False,
+                                                                  lineterminator="\n")
+    return out.getvalue().encode('utf-8')
+
+
+def _ics_text(value):
+    return value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def _ics_fold(line):
+    """Split a content line into lines of at most 75 octets"""
+    parts, current, size = [], '', 0
+    for char in line:
+        width = len(char.encode('utf-8'))
+        if size + width > 75:
+            parts.append(current)
+            current, size = ' ', 1
+        current += char
+        size += width
+    parts.append(current)
+    return "\r\n".join(parts) + "\r\n"
+
+
+def export_ics(df, calendar_name):
+    """iCalendar file with one event per plan of a typed plan frame"""
+    out = io.StringIO()
+    out.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Travel Planner//EN\r\n")
+    out.write(_ics_fold(f"X-WR-CALNAME:{_ics_text(calendar_name)}"))
+    stamp = time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())
+    for first in range(0, len(df), EXPORT_CHUNK):
+        chunk = df.iloc[first:first + EXPORT_CHUNK]
+        starts = chunk['When'].dt.strftime('%Y%m%dT%H%M%S')
+        for plan_id, title, start, location, category, notes in zip(
+                chunk['ID'], chunk['Title'], starts, chunk['Location'], chunk['Category'].astype(str),
+                chunk['Notes']):
+            lines = ["BEGIN:VEVENT", f"UID:{plan_id}@travel-planner", f"DTSTAMP:{stamp}",
+                     f"DTSTART:{start}", f"SUMMARY:{_ics_text(title)}"]
+            if location:
+                lines.append(f"LOCATION:{_ics_text(location)}")
+            if notes:
+                lines.append(f"DESCRIPTION:{_ics_text(notes)}")
+            lines += [f"CATEGORIES:{_ics_text(category)}", "END:VEVENT"]
+            out.write("".join(_ics_fold(line) for line in lines))
+    out.write("END:VCALENDAR\r\n")
+    return out.getvalue().encode('utf-8')
+
+
+def export_name(trip, extension):
+    """File name for an export of ``trip``"""
+    slug = re.sub(r"[^\w-]+", "-", trip.name.casefold()).strip("-") or "itinerary"
+    return f"{slug}.{extension}"
+
+
+SYNC_BADGES = {
+    'syncing': "<span style='color: #6b7280; font-size: 0.8rem;'>⏳ syncing</span>",
+    'synced': "<span style='color: #10b981; font-size: 0.8rem;'>✓ synced</span>",
+    'failed': "<span style='color: #dc2626; font-size: 0.8rem;'>⚠️ sync failed</span>",
+    'conflict': "<span style='color: #d97706; font-size: 0.8rem;'>⚠️ edited by someone else</span>",
+}
+
+def plan_version(df, plan_id):
+    """Version of a plan as loaded, to send along with an edit of it"""
+    match = df.loc[df['ID'] == str(plan_id), 'Version']
+    return int(match.iloc[0]) if len(match) else None
+
+
+def conflict_prompt(queue, ops):
+    """Let the user settle edits that lost a race with someone else's"""
+    for op in ops:
+        if op['status'] != 'conflict':
+            continue
+        theirs = dict(zip(PLAN_COLUMNS, op['remote']))
+        seq = op['seq']
+        with st.container(border=True):
+            if op['kind'] == 'delete':
+                st.warning(f"⚠️ **{theirs['Title']}** was changed by someone else before your delete reached the sheet.")
+                delete_col, keep_col = st.columns(2)
+                if delete_col.button("🗑️ Delete anyway", key=f"conflict_mine_{seq}"):
+                    queue.rebase(seq)
+                    st.rerun()
+                if keep_col.button("↩️ Keep it", key=f"conflict_theirs_{seq}"):
+                    queue.drop(seq)
+                    st.rerun()
+                continue
+
+            mine = dict(zip(PLAN_COLUMNS, _row_text(op['values'])))
+            st.warning(f"⚠️ **{mine['Title']}** was changed by someone else while you were editing it.")
+            changed = [c for c in MERGE_COLUMNS if mine[c] != theirs[c]]
+            st.table(pd.DataFrame({'Yours': [mine[c] for c in changed], 'Theirs': [theirs[c] for c in changed]},
+                                  index=changed))
+            merged, clashes = merge_rows(op['base'], op['values'], op['remote']) if op['base'] else (None, [])
+            if clashes:
+                st.caption(f"Both of you changed {', '.join(clashes)}; merging keeps your version of those.")
+            mine_col, merge_col, theirs_col = st.columns(3)
+            if mine_col.button("✍️ Keep mine", key=f"conflict_mine_{seq}"):
+                queue.rebase(seq)
+                st.rerun()
+            if merge_col.button("🔀 Merge", key=f"conflict_merge_{seq}", disabled=merged is None,
+                                help="Keep your changes and their changes to other fields"):
+                queue.rebase(seq, merged)
+                st.rerun()
+            if theirs_col.button("↩️ Use theirs", key=f"conflict_theirs_{seq}"):
+                queue.drop(seq)
+                st.rerun()
+
+
+def sync_status(queue, ops):
+    """Show pending and failed syncs, with retry/discard for failed edits"""
+    failed = [op for op in ops if op['status'] == 'failed']
+    if failed:
+        with st.expander(f"⚠️ {len(failed)} change{'s' if len(failed) != 1 else ''} failed to sync"):
+            for op in failed:
+                st.caption(f"{op['kind'].title()} of plan {op['plan_id']}: {op['error']}")
+            retry_col, discard_col = st.columns(2)
+            if retry_col.button("🔁 Retry", key="sync_retry"):
+                queue.retry_failed()
+                st.rerun()
+            if discard_col.button("🗑️ Discard", key="sync_discard"):
+                queue.discard_failed()
+                st.rerun()
+    conflicts = sum(op['status'] == 'conflict' for op in ops)
+    if conflicts:
+        st.warning(f"⚠️ {conflicts} change{'s' if conflicts != 1 else ''} collided with edits made by "
+                   "someone else. Resolve them under 'Add/Manage Plans'.")
+    if any(op['status'] == 'pending' for op in ops):
+        _sync_progress(queue)
+
+
+@st.fragment(run_every=2)
+@traced
+def _sync_progress(queue):
+    """Poll the queue while edits are syncing; refresh the page once it drains"""
+    syncing = sum(op['status'] == 'pending' for op in queue.pending())
+    if not syncing:
+        st.rerun(scope="app")
+    st.caption(f"⏳ Syncing {syncing} change{'s' if syncing != 1 else ''} to Google Sheets…")
+
+# Categories with colors and emojis
+CATEGORIES = {
+    'Dining': {'color': '#f97316', 'emoji': '🍽️'},
+    'Activity': {'color': '#3b82f6', 'emoji': '📸'},
+    'Café': {'color': '#d97706', 'emoji': '☕'},
+    'Travel': {'color': '#8b5cf6', 'emoji': '✈️'},
+    'Stay': {'color': '#10b981', 'emoji': '🏠'},
+    'Special': {'color': '#ec4899', 'emoji': '💕'},
+    'Shopping': {'color': '#f59e0b', 'emoji': '🛍️'}
+}
+
+# Trips. Each trip's plans live in their own worksheet, which is only opened,
+# mirrored and synced while that trip is selected.
+Trip = namedtuple('Trip', ['id', 'name', 'start', 'end', 'worksheet'])
+
+# The trip this planner started with; its plans are in the original sheet
+DEFAULT_TRIP = Trip('dec-2025', 'Our Adventure Together', date(2025, 12, 17), date(2026, 1, 1), 'Plans')
+
+def get_days_between(trip):
+    """Get list of all days in the trip"""
+    days = []
+    current = trip.start
+    while current <= trip.end:
+        days.append(current)
+        current += timedelta(days=1)
+    return days
+
+
+def _trip_row(trip):
+    return [trip.id, trip.name, trip.start.isoformat(), trip.end.isoformat(), trip.worksheet]
+
+
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
+def _load_trips(cache_key, data_version, _registry):
+    trips = []
+    for record in _registry.get_all_records(numericise_ignore=['all']):
+        start, end = _iso_date(record.get('Start')), _iso_date(record.get('End'))
+        if not record.get('ID') or start is None or end is None:
+            continue
+        trips.append(Trip(str(record['ID']), record.get('Name') or "Untitled trip",
+                          date.fromisoformat(start), date.fromisoformat(end),
+                          record.get('Worksheet') or f"Plans {record['ID']}"))
+    return trips
+
+
+def load_trips(registry):
+    """Trips in the registry, current and upcoming first, then past ones.
+
+    An empty registry (one emptied by hand) still offers
+    :data:`DEFAULT_TRIP`; it is only written back along with the next new
+    trip, see :func:`register_trip`.
+    """
+    try:
+        trips = _load_trips(registry.cache_key, registry.data_version, registry) or [DEFAULT_TRIP]
+    except Exception as e:
+        st.error(f"Error loading trips: {e}")
+        trips = [DEFAULT_TRIP]
+    today = date.today()
+    upcoming = sorted((t for t in trips if t.end >= today), key=lambda t: t.start)
+    past = sorted((t for t in trips if t.end < today), key=lambda t: t.start, reverse=True)
+    return upcoming + past
+
+
+def register_trip(registry, trips, name, start, end):
+    """Add a trip with its own (not yet created) worksheet to the registry"""
+    try:
+        taken = {t.worksheet for t in trips}
+        worksheet = title = f"Plans – {name}"[:90]
+        n = 2
+        while worksheet in taken:
+            worksheet = f"{title} ({n})"
+            n += 1
+        trip = Trip(new_plan_id()[:12], name, start, end, worksheet)
+        rows = [_trip_row(trip)]
+        if not registry.col_values(1)[1:]:
+            # keep the original trip listed next to the new one
+            rows.insert(0, _trip_row(DEFAULT_TRIP))
+        registry.append_rows(rows, value_input_option='RAW')
+        registry.bump_version()
+        return trip
+    except Exception as e:
+        st.error(f"Error creating trip: {e}")
+        return None
+
+
+def trip_label(trip, today=None):
+    past = trip.end < (today or date.today())
+    return (f"{'🗄️ ' if past else ''}{trip.name} ({trip.start.strftime('%b')} {trip.start.day} – "
+            f"{trip.end.strftime('%b')} {trip.end.day}, {trip.end.year})")
+
+
+def trip_picker(registry, trips):
+    """Sidebar picker of the trip to plan, with a form to start a new one"""
+    by_id = {trip.id: trip for trip in trips}
+    # A trip created on the previous run is selected before the picker exists
+    if st.session_state.get('created_trip') in by_id:
+        st.session_state['trip'] = st.session_state.pop('created_trip')
+    with st.sidebar:
+        st.subheader("🧳 Trips")
+        trip_id = st.selectbox("Trip", options=list(by_id), format_func=lambda i: trip_label(by_id[i]),
+                               key="trip", bind="query-params")
+        with st.expander("➕ New trip"):
+            with st.form("new_trip_form", clear_on_submit=True):
+                name = st.text_input("Name", placeholder="Spring in Kyoto")
+                dates = st.date_input("Dates", value=(date.today(), date.today() + timedelta(days=6)))
+                if st.form_submit_button("Create trip", use_container_width=True):
+                    if not name or len(dates) != 2:
+                        st.error("Please give the trip a name and a start and end date")
+                    else:
+                        trip = register_trip(registry, trips, name, *dates)
+                        if trip:
+                            st.session_state['created_trip'] = trip.id
+                            st.rerun()
+    return by_id.get(trip_id, trips[0])
+
+
+def trip_header(trip):
+    """The page header for ``trip``, or a generic one while trips load"""
+    if trip is None:
+        title, subtitle = "Our Adventures", "&nbsp;"
+    else:
+        days = (trip.end - trip.start).days + 1
+        title = escape(trip.name)
+        span = " - ".join(f"{d.strftime('%b')} {d.day}, {d.year}" for d in (trip.start, trip.end))
+        subtitle = f"{span} • {days} magical day{'s' if days != 1 else ''}"
+    return f"""
+    <div class="main-header">
+        <h1>💕 {title}</h1>
+        <p style="font-size: 1.2rem; margin-top: 0.5rem;">{subtitle}</p>
+    </div>
+    """
+
+# Plan cards. Each card is escaped HTML, built once per distinct content and
+# view and kept in a process-wide LRU, so re-rendering a large itinerary
+# after a small edit only builds the cards that changed.
+CARD_CACHE_SIZE = 25000     # both views of a 10,000-plan trip, with room for edits
+
+# (heading margin, detail line margin) per view
+_CARD_LAYOUTS = {
+    'timeline': ("0 0 0.25rem 0", "0"),
+    'list': ("0 0 0.5rem 0", "0.25rem 0"),
+}
+
+
+class CardCache:
+    """Least-recently-used map from a card's view and content to its HTML"""
+
+    def __init__(self, size=CARD_CACHE_SIZE):
+        self.size = size
+        self.hits = self.misses = 0
+        self._cards = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cards)
+
+    def get(self, key, render):
+        """The card for ``key``, calling ``render()`` to build it on a miss"""
+        with self._lock:
+            card = self._cards.get(key)
+            if card is not None:
+                self._cards.move_to_end(key)
+                self.hits += 1
+                return card
+        card = render()
+        with self._lock:
+            self.misses += 1
+            self._cards[key] = card
+            while len(self._cards) > self.size:
+                self._cards.popitem(last=False)
+        return card
+
+
+@st.cache_resource(show_spinner=False)
+def get_card_cache():
+    return CardCache()
+
+
+def _render_card(view, category, title, day, clock, location, notes, status):
+    cat = CATEGORIES.get(category, CATEGORIES['Dining'])
+    heading_margin, line_margin = _CARD_LAYOUTS[view]
+    when = f"📅 {escape(day)} | 🕐 {escape(clock)}" if view == 'list' else f"🕐 {escape(clock)}"
+    location_html = f" | 📍 {escape(location)}" if location else ''
+    note_html = (f"<p style='margin: 0.5rem 0 0 0; color: #4b5563; font-style: italic;'>{escape(notes)}</p>"
+                 if notes else '')
+    return (
+        f"<div class=\"trip-card\" style=\"border-left-color: {cat['color']};\">"
+        f"<h3 style=\"margin: {heading_margin}; color: #1f2937;\">{cat['emoji']} {escape(title)} "
+        f"{SYNC_BADGES.get(status, '')}</h3>"
+        f"<p style=\"margin: {line_margin}; color: #6b7280;\">{when}{location_html}</p>"
+        f"{note_html}"
+        f"</div>"
+    )
+
+
+def plan_card(view, plan, status=None, cache=None):
+    """Card HTML for a plan record in ``view`` ('timeline' or 'list').
+
+    Title, location and notes are escaped. Cards are memoized by what they
+    show rather than by plan ID, so a plan is only rendered again once
+    something on its card (or its sync ``status``) changed.
+    """
+    key = (view, str(plan['Category']), plan['Title'], plan.get('Day', ''), plan['Time'],
+           plan['Location'], plan['Notes'], status)
+    cache = get_card_cache() if cache is None else cache
+    return cache.get(key, lambda: _render_card(*key))
+
+
+def _ops_key(ops):
+    """Hashable summary of the pending edits that affect what views show"""
+    return tuple((op['seq'], op['status'], op['attempts']) for op in ops)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _timeline_blocks(sheet_key, revision, ops_key, categories, badges, trip, _mirror, _ops):
+    df = plans_view(_mirror, _ops, categories=list(categories) if categories else None,
+                    start=trip.start, end=trip.end)
+    badges = dict(badges)
+    df = df.assign(Time=df['When'].dt.strftime('%H:%M'))
+    # rows arrive sorted by When, so each day is one contiguous group
+    buckets = {day: group for day, group in df.groupby(df['When'].dt.date, sort=False)}
+    cards = get_card_cache()
+    blocks = []
+    for number, day in enumerate(get_days_between(trip), start=1):
+        html = [f"<div style='margin: 0.5rem 0; padding: 0.5rem 0;'>"
+                f"<strong>{day.strftime('%A, %B %d, %Y')}</strong> — Day {number}"
+                f"</div>"]
+        options = []
+        day_plans = buckets.get(day)
+        if day_plans is None:
+            html.append("<div class=\"trip-card\" style=\"border-left-color: #93c5fd; color: #6b7280;\">"
+                        "No plans for this day yet</div>")
+        else:
+            for plan in day_plans.to_dict('records'):
+                html.append(plan_card('timeline', plan, badges.get(str(plan['ID'])), cards))
+                options.append((str(plan['ID']), f"{plan['Time']} {plan['Title']}"))
+        blocks.append((day, "".join(html), options))
+    return blocks
+
+
+def timeline_blocks(mirror, ops, categories, badges, trip):
+    """One pre-rendered HTML block per day of ``trip``, plus (ID, label) pairs
+    for its plans. Cached per mirror revision, pending edits and filter."""
+    return _timeline_blocks(
+        mirror.worksheet.cache_key, mirror.revision, _ops_key(ops),
+        tuple(categories) if categories else None, tuple(sorted(badges.items())), trip,
+        mirror, ops,
+    )
+
+LIST_SORTS = {
+    "Date (earliest first)": 'date',
+    "Date (latest first)": 'date_desc',
+    "Title (A–Z)": 'title',
+}
+LIST_PAGE_SIZES = [10, 25, 50, 100]
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _list_index(sheet_key, revision, ops_key, category, order, _mirror, _ops):
+    df = plans_view(_mirror, _ops, categories=[category] if category else None, order=order)
+    # cards only need the formatted date and time
+    df = df.assign(Day=df['When'].dt.strftime('%b %d, %Y'), Time=df['When'].dt.strftime('%H:%M'))
+    return df.drop(columns='When').to_dict('records')
+
+
+def list_index(mirror, ops, category, order):
+    """Filtered plans in display order, cached per mirror revision and
+    pending edits so paging through them doesn't re-query or re-sort"""
+    return _list_index(mirror.worksheet.cache_key, mirror.revision, _ops_key(ops), category, order,
+                       mirror, ops)
+
+
+def _set_list_page(page):
+    st.session_state['list_page'] = page
+
+Snapshot = namedtuple('Snapshot', ['mirror', 'queue', 'ops', 'df', 'badges'])
+
+PLAN_TABS = ["📅 Timeline View", "📋 List View", "➕ Add/Manage Plans"]
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _snapshot_frame(sheet_key, revision, ops_key, _mirror, _ops):
+    return typed_plans(apply_pending(load_data(_mirror), _ops))
+
+
+def plans_snapshot(worksheet):
+    """The plans, queued edits and sync badges the page renders from.
+
+    Built from the local mirror and cached per mirror revision and queue
+    state, so the stats, tabs and forms below, each a fragment that can
+    rerun on its own, share one copy without touching the sheet. Syncing
+    the mirror is left to full runs (:func:`load_mirror`).
+    """
+    with get_metrics().section("load"):
+        mirror = _get_mirror(worksheet.cache_key, worksheet)
+        queue = get_write_queue(worksheet)
+        ops = queue.pending()
+        df = _snapshot_frame(worksheet.cache_key, mirror.revision, _ops_key(ops), mirror, ops)
+        return Snapshot(mirror, queue, ops, df, queue.status_by_plan(ops))
+
+
+# Search terms at least this long also match words one typo away
+SEARCH_FUZZY_MIN_LENGTH = 4
+SEARCH_FIELDS = ['Title', 'Location', 'Notes']
+_SEARCH_WORD = re.compile(r"\w+")
+
+
+def _search_words(text):
+    """Lower-cased words of ``text`` with accents stripped ("Café" -> "cafe")"""
+    text = unicodedata.normalize('NFKD', text.casefold())
+    return _SEARCH_WORD.findall(''.join(c for c in text if not unicodedata.combining(c)))
+
+
+def _deletions(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+class PlanSearchIndex:
+    """Inverted index over the Title, Location and Notes of a sheet's plans.
+
+    Maps every word to the IDs of the plans containing it. A query matches
+    plans that contain, for each of its words, a word starting with it or,
+    for longer words, one typo away from it (found through the words'
+    single-character deletions). :meth:`sync` is called with each new
+    snapshot and only re-indexes plans whose text changed, so adds, edits,
+    deletes and delta syncs don't rebuild the index.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key = None
+        self._texts = {}                     # plan ID -> indexed text
+        self._postings = defaultdict(set)    # word -> plan IDs
+        self._deletes = defaultdict(set)     # word minus one character -> words
+        self._vocabulary = []                # sorted words, for prefix lookups
+        self._stale = False
+
+    def _add_word(self, word):
+        self._stale = True
+        if len(word) >= SEARCH_FUZZY_MIN_LENGTH:
+            for variant in _deletions(word):
+                self._deletes[variant].add(word)
+
+    def _drop_word(self, word):
+        self._stale = True
+        del self._postings[word]
+        if len(word) >= SEARCH_FUZZY_MIN_LENGTH:
+            for variant in _deletions(word):
+                self._deletes[variant].discard(word)
+                if not self._deletes[variant]:
+                    del self._deletes[variant]
+
+    def _index(self, plan_id, text):
+        for word in set(_search_words(text)):
+            if word not in self._postings:
+                self._add_word(word)
+            self._postings[word].add(plan_id)
+        self._texts[plan_id] = text
+
+    def _unindex(self, plan_id):
+        for word in set(_search_words(self._texts.pop(plan_id))):
+            self._postings[word].discard(plan_id)
+            if not self._postings[word]:
+                self._drop_word(word)
+
+    def sync(self, key, df):
+        """Bring the index in line with ``df``, the snapshot identified by ``key``"""
+        with self._lock:
+            if key == self._key:
+                return
+            text = df[SEARCH_FIELDS[0]].astype(str)
+            for field in SEARCH_FIELDS[1:]:
+                text = text + " " + df[field].astype(str)
+            texts = dict(zip(df['ID'], text))
+            for plan_id in self._texts.keys() - texts.keys():
+                self._unindex(plan_id)
+            for plan_id, value in texts.items():
+                if self._texts.get(plan_id) != value:
+                    if plan_id in self._texts:
+                        self._unindex(plan_id)
+                    self._index(plan_id, value)
+            self._key = key
+
+    def _matches(self, term):
+        if self._stale:
+            self._vocabulary = sorted(self._postings)
+            self._stale = False
+        words = set()
+        for word in self._vocabulary[bisect_left(self._vocabulary, term):]:
+            if not word.startswith(term):
+                break
+            words.add(word)
+        if len(term) >= SEARCH_FUZZY_MIN_LENGTH:
+            for variant in _deletions(term) | {term}:
+                words |= self._deletes.get(variant, set())
+            words |= {word for word in _deletions(term) if word in self._postings}
+        ids = set()
+        for word in words:
+            ids |= self._postings[word]
+        return ids
+
+    def search(self, query):
+        """IDs of the plans matching every word of ``query``"""
+        with self._lock:
+            hits = None
+            for term in set(_search_words(query)):
+                ids = self._matches(term)
+                hits = ids if hits is None else hits & ids
+                if not hits:
+                    break
+            return hits if hits is not None else set(self._texts)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_search_index(cache_key):
+    return PlanSearchIndex()
+
+
+def search_plans(worksheet, snapshot, query):
+    """IDs of the plans in ``snapshot`` matching ``query``, or None for no query"""
+    if not query or not query.strip():
+        return None
+    with get_metrics().section("search"):
+        index = _get_search_index(worksheet.cache_key)
+        index.sync((snapshot.mirror.revision, _ops_key(snapshot.ops)), snapshot.df)
+        return index.search(query)
+
+
+@st.fragment
+@traced
+def stats_header(worksheet, trip):
+    """The three stat cards"""
+    df = plans_snapshot(worksheet).df
+    with get_metrics().section("stats"):
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.markdown(f"""
+            <div class="stat-card">
+                <h2 style="color: #ec4899; margin: 0;">📅 {len(df)}</h2>
+                <p style="margin: 0.5rem 0 0 0; color: #6b7280;">Total Plans</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+        with col2:
+            days = (trip.end - trip.start).days + 1
+            st.markdown(f"""
+            <div class="stat-card">
+                <h2 style="color: #ec4899; margin: 0;">❤️ {days}</h2>
+                <p style="margin: 0.5rem 0 0 0; color: #6b7280;">Days Together</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+        with col3:
+            days_planned = df['When'].dt.normalize().nunique()
+            st.markdown(f"""
+            <div class="stat-card">
+                <h2 style="color: #10b981; margin: 0;">✅ {days_planned}/{days}</h2>
+                <p style="margin: 0.5rem 0 0 0; color: #6b7280;">Days Planned</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+
+@st.fragment
+@traced
+def timeline_tab(worksheet, trip):
+    """Timeline tab; changing its filter reruns only this fragment"""
+    mirror, queue, pending_ops, df, sync_badges = plans_snapshot(worksheet)
+    with get_metrics().section("timeline"):
+        # Timeline view - simple top-to-bottom list (linear)
+        st.subheader("Timeline — Linear View")
+
+        # Category filter
+        filter_col1, _ = st.columns([3, 1])
+        with filter_col1:
+            selected_categories = st.multiselect(
+                "Filter by category",
+                options=list(CATEGORIES.keys()),
+                default=list(CATEGORIES.keys())
+            )
+
+        blocks = timeline_blocks(mirror, pending_ops, selected_categories, sync_badges, trip)
+
+        for day, html, options in blocks:
+            col_main, col_action = st.columns([10, 1])
+            with col_main:
+                st.markdown(html, unsafe_allow_html=True)
+
+            if options:
+                with col_action:
+                    labels = dict(options)
+                    with st.popover("🗑️"):
+                        plan_id = st.selectbox("Plan", options=list(labels), format_func=labels.get,
+                                               key=f"tl_pick_{day}", label_visibility="collapsed")
+                        if st.button("Delete", key=f"tl_del_{day}"):
+                            if delete_trip(queue, plan_id, plan_version(df, plan_id)):
+                                st.toast("Deleted!")
+                                st.rerun()
+
+
+@st.fragment
+@traced
+def list_tab(worksheet, active_trip, query=None):
+    """List tab; filtering, sorting and paging rerun only this fragment"""
+    snapshot = plans_snapshot(worksheet)
+    mirror, queue, pending_ops, df, sync_badges = snapshot
+    with get_metrics().section("list"):
+        # List view - show all plans in table
+        st.subheader("All Plans")
+    
+        if len(df) == 0:
+            st.info("No plans added yet. Go to 'Add/Manage Plans' tab to create your first plan!")
+        else:
+            # Filter
+            filter_category = st.selectbox(
+                "Filter by category",
+                options=['All'] + list(CATEGORIES.keys())
+            )
+        
+            sort_col, size_col = st.columns([3, 1])
+            with sort_col:
+                sort_label = st.selectbox("Sort by", options=list(LIST_SORTS))
+            with size_col:
+                page_size = st.selectbox("Per page", options=LIST_PAGE_SIZES, index=1)
+
+            category = None if filter_category == 'All' else filter_category
+            order = LIST_SORTS[sort_label]
+            plans = list_index(mirror, pending_ops, category, order)
+            hits = search_plans(worksheet, snapshot, query)
+
+            def shown():
+                # the list as filtered, from the snapshot; built only when downloaded
+                view = df if category is None else df[df['Category'] == category]
+                return sort_plans(view if hits is None else view[view['ID'].isin(hits)], order)
+
+            csv_col, ics_col = st.columns(2)
+            csv_col.download_button("⬇️ Export CSV", data=lambda: export_csv(shown()),
+                                    file_name=export_name(active_trip, "csv"), mime="text/csv",
+                                    key="export_csv", on_click="ignore", use_container_width=True)
+            ics_col.download_button("📆 Export calendar (.ics)", data=lambda: export_ics(shown(), active_trip.name),
+                                    file_name=export_name(active_trip, "ics"), mime="text/calendar",
+                                    key="export_ics", on_click="ignore", use_container_width=True)
+            if hits is not None:
+                plans = [plan for plan in plans if plan['ID'] in hits]
+                if not plans:
+                    st.info("No plans match your search.")
+            pages = max(1, -(-len(plans) // page_size))
+            page = min(st.session_state.get('list_page', 1), pages)
+            first = (page - 1) * page_size
+        
+            # Display only the current page
+            cards = get_card_cache()
+            for trip in plans[first:first + page_size]:
+                col1, col2 = st.columns([5, 1])
+            
+                with col1:
+                    st.markdown(plan_card('list', trip, sync_badges.get(str(trip['ID'])), cards),
+                                unsafe_allow_html=True)
+            
+                with col2:
+                    if st.button("🗑️ Delete", key=f"del_{trip['ID']}"):
+                        if delete_trip(queue, trip['ID'], trip['Version']):
+                            st.toast("Deleted!")
+                            st.rerun()
+
+            prev_col, info_col, next_col = st.columns([1, 4, 1])
+            prev_col.button("← Prev", key="list_prev", disabled=page <= 1,
+                            on_click=_set_list_page, args=(page - 1,))
+            info_col.caption(f"Page {page} of {pages} · showing {first + 1 if plans else 0}–"
+                             f"{min(first + page_size, len(plans))} of {len(plans)} plans")
+            next_col.button("Next →", key="list_next", disabled=page >= pages,
+                            on_click=_set_list_page, args=(page + 1,))
+
+
+@st.fragment
+@traced
+def add_plan_form(worksheet, trip):
+    """Form for a new plan"""
+    queue = get_write_queue(worksheet)
+    with get_metrics().section("manage"):
+        st.subheader("Add New Plan")
+    
+        with st.form("add_trip_form"):
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                title = st.text_input("Title *", placeholder="Dinner at Italian restaurant")
+                trip_date = st.date_input(
+                    "Date *",
+                    min_value=trip.start,
+                    max_value=trip.end,
+                    value=trip.start
+                )
                 time = st.time_input("Time", value=datetime.strptime("19:00", "%H:%M").time())
                 location = st.text_input("Location", placeholder="Restaurant name or address")
-            
+        
             with col2:
                 category = st.selectbox("Category *", options=list(CATEGORIES.keys()))
                 notes = st.text_area("Notes", placeholder="Special details or reminders...")
-            
+        
             submitted = st.form_submit_button("✨ Add Plan", use_container_width=True)
-            
+        
             if submitted:
                 if title and trip_date:
-                    trip_id = str(int(datetime.now().timestamp()))
-                    trip_data = [
-                        trip_id,
+                    plan = [
+                        new_plan_id(),
                         title,
-                        trip_date.strftime("%Y-%m-%d"),
-                        time.strftime("%H:%M"),
+                        datetime.combine(trip_date, time),
                         location,
                         category,
                         notes,
-                        datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        1
                     ]
-                    
-                    if add_trip(worksheet, trip_data):
-                        st.success("🎉 Plan added successfully!")
+                
+                    if add_trip(queue, plan):
+                        st.toast("🎉 Plan added successfully!")
                         st.rerun()
                 else:
                     st.error("Please fill in Title and Date")
-        
-        st.markdown("---")
+
+
+@st.fragment
+@traced
+def import_plans(worksheet, trip):
+    """Bulk import of plans from a CSV or iCalendar file"""
+    mirror, queue, pending_ops, df, sync_badges = plans_snapshot(worksheet)
+    with get_metrics().section("manage"):
+        with st.expander("📥 Import plans from a CSV or calendar file"):
+            st.caption("CSV files need Title and Date columns and can have Time, Location, Category and "
+                       f"Notes. Dates must fall within the trip. A category, where given, must be one of "
+                       f"{', '.join(CATEGORIES)}; plans without one get the category picked below.")
+            upload = st.file_uploader("Itinerary", type=['csv', 'ics'], key="import_file")
+            default_category = st.selectbox("Category for plans without one", options=list(CATEGORIES),
+                                            index=list(CATEGORIES).index(IMPORT_DEFAULT_CATEGORY),
+                                            key="import_category")
+            if upload is None:
+                return
+            try:
+                result = validate_import(read_import(upload), trip, df, default_category)
+            except Exception as e:
+                st.error(f"Could not read {upload.name}: {e}")
+                return
+
+            if result.errors:
+                count = len(result.errors)
+                st.warning(f"⚠️ {count} plan{'s' if count != 1 else ''} can't be imported.")
+                st.dataframe(pd.DataFrame(result.errors, columns=['Line', 'Problem']), hide_index=True)
+            if result.duplicates:
+                st.caption(f"Skipping {result.duplicates} plan{'s' if result.duplicates != 1 else ''} "
+                           "already in the itinerary.")
+            count = len(result.plans)
+            if count and st.button(f"📥 Import {count} plan{'s' if count != 1 else ''}", key="import_submit",
+                                   use_container_width=True):
+                if add_trips(queue, result.plans):
+                    st.toast(f"🎉 Imported {count} plan{'s' if count != 1 else ''}!")
+                    st.rerun()
+
+
+@st.fragment
+@traced
+def manage_plans(worksheet, active_trip, query=None):
+    """Conflict prompts and the edit form; picking a plan reruns only this fragment"""
+    snapshot = plans_snapshot(worksheet)
+    mirror, queue, pending_ops, df, sync_badges = snapshot
+    with get_metrics().section("manage"):
         st.subheader("Manage Existing Plans")
-        
+        conflict_prompt(queue, pending_ops)
+    
+        hits = search_plans(worksheet, snapshot, query)
+        if hits is not None:
+            df = df[df['ID'].isin(hits)].reset_index(drop=True)
+            if len(df) == 0:
+                st.info("No plans match your search.")
+                return
+
         if len(df) > 0:
             # Select plan to edit
-            plan_options = [f"{row['Title']} - {row['Date'].strftime('%b %d')}" for idx, row in df.iterrows()]
+            plan_options = (df['Title'] + " - " + df['When'].dt.strftime('%b %d')).tolist()
             selected_plan = st.selectbox("Select a plan to edit", options=range(len(plan_options)), format_func=lambda x: plan_options[x])
-            
+        
             if selected_plan is not None:
                 trip = df.iloc[selected_plan]
-                
+                when = trip['When']
+                if sync_badges.get(str(trip['ID'])) == 'conflict':
+                    st.warning("Someone else changed this plan too. Settle that above before editing it again.")
+            
                 with st.form("edit_trip_form"):
                     col1, col2 = st.columns(2)
-                    
+                
                     with col1:
                         edit_title = st.text_input("Title *", value=trip['Title'])
                         edit_date = st.date_input(
                             "Date *",
-                            value=trip['Date'],
-                            min_value=TRIP_START,
-                            max_value=TRIP_END
+                            value=when.date(),
+                            min_value=min(active_trip.start, when.date()),
+                            max_value=max(active_trip.end, when.date())
                         )
-                        edit_time = st.time_input("Time", value=datetime.strptime(trip['Time'], "%H:%M").time())
+                        edit_time = st.time_input("Time", value=when.time())
                         edit_location = st.text_input("Location", value=trip['Location'])
-                    
+                
                     with col2:
-                        edit_category = st.selectbox("Category *", options=list(CATEGORIES.keys()), index=list(CATEGORIES.keys()).index(trip['Category']))
+                        # a category set outside the app (or none) is offered too, so saving keeps it
+                        categories = list(CATEGORIES)
+                        if trip['Category'] not in categories:
+                            categories.append(trip['Category'])
+                        edit_category = st.selectbox("Category *", options=categories,
+                                                     index=categories.index(trip['Category']),
+                                                     format_func=lambda c: c or "(none)")
                         edit_notes = st.text_area("Notes", value=trip['Notes'])
-                    
+                
                     update_submitted = st.form_submit_button("💾 Update Plan", use_container_width=True)
-                    
+                
                     if update_submitted:
-                        updated_data = [
+                        plan = [
                             trip['ID'],
                             edit_title,
-                            edit_date.strftime("%Y-%m-%d"),
-                            edit_time.strftime("%H:%M"),
+                            datetime.combine(edit_date, edit_time),
                             edit_location,
                             edit_category,
                             edit_notes,
-                            trip['Created']
+                            trip['Created'],
+                            int(trip['Version']) + 1
                         ]
-                        
-                        if update_trip(worksheet, selected_plan, updated_data):
-                            st.success("✅ Plan updated successfully!")
+                    
+                        if update_trip(queue, trip['ID'], plan, base_version=int(trip['Version']),
+                                       base=plan_rows(df.iloc[[selected_plan]])[0]):
+                            st.toast("✅ Plan updated successfully!")
                             st.rerun()
         else:
             st.info("No plans to edit yet.")
 
+
+PAGE_SKELETON = '<div class="skeleton"></div>' * 3
+
+
+def render_app(metrics):
+    # Header of the trip shown last, until the trips are loaded
+    header = st.empty()
+    header.markdown(trip_header(st.session_state.get('current_trip')), unsafe_allow_html=True)
+    
+    # Placeholder cards until the Sheets client (imported on first use) and
+    # the plans are ready
+    skeleton = st.empty()
+    skeleton.markdown(PAGE_SKELETON, unsafe_allow_html=True)
+    
+    # Connect to Google Sheets (shared across reruns and sessions); the trips
+    # registry is opened first and then only the selected trip's worksheet
+    with metrics.section("connect"):
+        registry = get_connection("Trips", TRIP_COLUMNS)
+        client = registry.get_client() if registry else None
+        connected = registry.connect() if client else None
+    
+    if not client:
+        skeleton.empty()
+        st.warning("⚠️ Google Sheets connection not configured. Please add your service account credentials to Streamlit secrets.")
+        st.info("""
+        **Setup Instructions:**
+        1. Create a Google Cloud Project
+        2. Enable Google Sheets API and Google Drive API
+        3. Create a Service Account and download the JSON key
+        4. Add the JSON content to Streamlit secrets as 'gcp_service_account'
+        5. Share your Google Sheet with the service account email
+        """)
+        return
+    
+    if not connected:
+        skeleton.empty()
+        st.error("Could not obtain a Google Sheet. See the instructions above to resolve Drive quota or share an existing sheet with the service account.")
+        return
+    
+    trip = trip_picker(registry, load_trips(registry))
+    st.session_state['current_trip'] = trip
+    header.markdown(trip_header(trip), unsafe_allow_html=True)
+    
+    with metrics.section("connect"):
+        conn = get_connection(trip.worksheet)
+        connected = conn.connect() if conn else None
+    
+    if not connected:
+        skeleton.empty()
+        st.error(f"Could not open the worksheet for {trip.name}.")
+        return
+
+    # The connection proxies worksheet methods and reconnects on failures
+    worksheet = conn
+
+    # Sync the local mirror of the sheet; every part of the page then renders
+    # from the same snapshot of it (see plans_snapshot). The shared watcher
+    # keeps it current and reruns the page when others change the sheet.
+    queue = get_write_queue(worksheet)
+    with metrics.section("sync"):
+        mirror = load_mirror(worksheet)
+    watch_for_changes(mirror, mirror.revision)
+    skeleton.empty()
+    sync_status(queue, queue.pending())
+    
+    stats_header(worksheet, trip)
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    # Searches the list and the plans offered for editing
+    query = st.text_input("🔍 Search plans", key="plan_search", placeholder="Title, place or note",
+                          on_change=_set_list_page, args=(1,))
+    
+    # Main tabs; only the open one is built
+    tab1, tab2, tab3 = st.tabs(PLAN_TABS, key="plan_tabs", on_change="rerun")
+    
+    if tab1.open:
+        with tab1:
+            timeline_tab(worksheet, trip)
+    
+    if tab2.open:
+        with tab2:
+            list_tab(worksheet, trip, query)
+    
+    if tab3.open:
+        with tab3:
+            add_plan_form(worksheet, trip)
+            import_plans(worksheet, trip)
+            st.markdown("---")
+            manage_plans(worksheet, trip, query)
+
+
+def main():
+    metrics = get_metrics()
+    with metrics.rerun() as trace:
+        render_app(metrics)
+        if debug_panel_enabled():
+            render_debug_panel(metrics, trace)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "benchmarks")]
+
+import streamlit_app as app  # noqa: E402
+from fake_sheets import FakeWorksheet, install, make_plans  # noqa: E402
+
+
+@pytest.fixture
+def sheet():
+    """A fake Plans worksheet with three plans, served to ``gspread.authorize``"""
+    worksheet = FakeWorksheet(make_plans(3))
+    with install(worksheet):
+        yield worksheet
+
+
+@pytest.fixture
+def connection(sheet):
+    return app.SheetConnection({"type": "service_account"}, app.SPREADSHEET_NAME, "Plans", creds_key="test")
+
+
+@pytest.fixture
+def queue(connection, tmp_path, monkeypatch):
+    """A write-behind queue whose worker thread stays idle; tests call ``sync_once``"""
+    monkeypatch.setattr(app.WriteBehindQueue, "_run", lambda self: None)
+    return app.WriteBehindQueue(connection, tmp_path / "pending_writes.sqlite3")
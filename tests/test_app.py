@@ -0,0 +1,23 @@
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+from fake_sheets import FakeWorksheet, install, make_plans
+
+APP = Path(__file__).resolve().parent.parent / "streamlit_app.py"
+
+
+def test_plan_with_a_category_from_outside_the_app_stays_editable(tmp_path, monkeypatch):
+    monkeypatch.setenv("PLANNER_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("PLANNER_WATCH_INTERVAL", "0")
+    rows = make_plans(2)
+    rows[1][5] = "Museum"
+    with install(FakeWorksheet(rows)):
+        at = AppTest.from_file(str(APP), default_timeout=60)
+        at.secrets["gcp_service_account"] = {"type": "service_account", "client_email": "edit@example.com"}
+        at.session_state["plan_tabs"] = "➕ Add/Manage Plans"
+        at.run()
+
+        assert not at.exception
+        edit_category = [s for s in at.selectbox if s.label == "Category *"][-1]
+        assert edit_category.value == "Museum"
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+import gspread
+import pytest
+
+import streamlit_app as app
+
+
+def _api_error(code):
+    response = SimpleNamespace(json=lambda: {'error': {'code': code, 'message': "backend error", 'status': ''}},
+                               text="")
+    return gspread.exceptions.APIError(response)
+
+
+def test_write_applied_before_a_server_error_is_not_sent_again(sheet, connection, monkeypatch):
+    apply = sheet.spreadsheet.batch_update
+
+    def applied_then_failed(body):
+        apply(body)
+        raise _api_error(500)
+
+    monkeypatch.setattr(sheet.spreadsheet, 'batch_update', applied_then_failed)
+    batch = app.WriteBatch(connection)
+    batch.delete(0)
+
+    result, = batch.flush()
+
+    assert not result.ok
+    assert [row[0] for row in sheet.rows[1:]] == ['100001', '100002']
+    assert sheet.backend.calls['spreadsheet.batch_update'] == 1
+
+
+def test_failed_write_reconnects_for_the_next_call(sheet, connection, monkeypatch):
+    connection.connect()
+    monkeypatch.setattr(sheet, 'update_cell', lambda *args: (_ for _ in ()).throw(_api_error(503)))
+
+    with pytest.raises(gspread.exceptions.APIError):
+        connection.update_cell(2, 2, "x")
+    assert connection._worksheet is None
+
+
+def test_read_is_retried_on_a_fresh_connection(sheet, connection, monkeypatch):
+    connection.connect()
+    read = sheet.row_values
+    failures = [_api_error(401)]
+
+    def flaky(*args, **kwargs):
+        if failures:
+            raise failures.pop()
+        return read(*args, **kwargs)
+
+    monkeypatch.setattr(sheet, 'row_values', flaky)
+
+    assert connection.row_values(1) == app.PLAN_COLUMNS
@@ -0,0 +1,67 @@
+import io
+from datetime import date
+
+import pandas as pd
+
+import streamlit_app as app
+
+TRIP = app.Trip('t', "Test trip", date(2025, 12, 17), date(2026, 1, 1), 'Plans')
+NO_PLANS = pd.DataFrame({'Title': pd.Series(dtype=str), 'When': pd.Series(dtype='datetime64[ns]')})
+
+
+class Upload(io.BytesIO):
+    def __init__(self, name, text):
+        super().__init__(text.encode())
+        self.name = name
+
+
+def _import(name, text, **kwargs):
+    return app.validate_import(app.read_import(Upload(name, text)), TRIP, NO_PLANS, **kwargs)
+
+
+def test_csv_without_categories_gets_the_default():
+    result = _import("plans.csv", "Title,Date\nDinner,2025-12-20\nMuseum,2025-12-21\n")
+
+    assert result.errors == []
+    assert list(result.plans['Category']) == [app.IMPORT_DEFAULT_CATEGORY] * 2
+
+
+def test_blank_category_gets_the_picked_default_and_unknown_ones_are_rejected():
+    result = _import("plans.csv", "Title,Date,Category\nDinner,2025-12-20,\nMuseum,2025-12-21,Nap\n",
+                     default_category='Dining')
+
+    assert list(result.plans['Title']) == ["Dinner"]
+    assert list(result.plans['Category']) == ['Dining']
+    assert [line for line, _ in result.errors] == [3]
+
+
+ICS = """BEGIN:VCALENDAR
+BEGIN:VEVENT
+SUMMARY:Flight
+DTSTART:20251220T183000Z
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Dinner
+DTSTART;TZID=America/New_York:20251220T190000
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Walk
+DTSTART:20251221T090000
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+def test_ics_without_categories_and_with_zoned_times(monkeypatch):
+    monkeypatch.setattr(app, 'LOCAL_TIMEZONE', 'Europe/Paris')
+
+    result = _import("calendar.ics", ICS)
+
+    assert result.errors == []
+    assert set(result.plans['Category']) == {app.IMPORT_DEFAULT_CATEGORY}
+    when = dict(zip(result.plans['Title'], result.plans['When'].dt.strftime('%Y-%m-%d %H:%M')))
+    assert when == {
+        "Flight": "2025-12-20 19:30",       # UTC+1 in December
+        "Dinner": "2025-12-21 01:00",       # New York is six hours behind Paris
+        "Walk": "2025-12-21 09:00",         # floating times are kept
+    }
@@ -0,0 +1,45 @@
+import streamlit_app as app
+
+
+def test_read_builds_the_index_then_only_verifies_rows(sheet, connection):
+    index = app.RowIndex(connection)
+
+    assert index.read({'100001'}) == {'100001': (1, 1)}
+    sheet.backend.calls.clear()
+    assert index.read({'100001', '100002'}) == {'100001': (1, 1), '100002': (2, 1)}
+    # one batch_get of the target rows, no rebuild
+    assert sheet.backend.calls == {'batch_get': 1}
+    assert index.peek({'100000'}) == {'100000': 0}
+
+
+def test_read_rebuilds_when_a_row_moved(sheet, connection):
+    index = app.RowIndex(connection)
+    index.read({'100002'})
+    # removed directly in the spreadsheet: the rows below move up
+    del sheet.rows[1]
+
+    assert index.read({'100002'}) == {'100002': (1, 1)}
+    assert index.peek({'100000'}) == {}
+
+
+def test_read_leaves_out_plans_not_in_the_sheet(sheet, connection):
+    index = app.RowIndex(connection)
+
+    assert index.read({'100001', 'gone'}) == {'100001': (1, 1)}
+
+
+def test_apply_follows_deletes_and_adds(sheet, connection):
+    index = app.RowIndex(connection)
+    index.read({'100000'})
+
+    index.apply(deleted=[0], appended=['new'])
+
+    assert index.peek({'100001', '100002', 'new', '100000'}) == {'100001': 0, '100002': 1, 'new': 2}
+
+
+def test_apply_is_ignored_until_the_index_is_built(connection):
+    index = app.RowIndex(connection)
+
+    index.apply(deleted=[0], appended=['new'])
+
+    assert index.peek({'new'}) == {}
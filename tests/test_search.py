@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+import streamlit_app as app
+
+
+def _plans(*plans):
+    return pd.DataFrame(plans, columns=['ID', 'Title', 'Location', 'Notes'])
+
+
+@pytest.fixture
+def index():
+    index = app.PlanSearchIndex()
+    index.sync(1, _plans(
+        ('1', "Dinner at Chez Marie", "Montmartre", ""),
+        ('2', "Louvre", "Rue de Rivoli", "Book the museum tickets"),
+        ('3', "Café crawl", "Le Marais", "Try the croissants"),
+    ))
+    return index
+
+
+def test_words_match_by_prefix(index):
+    assert index.search("mus") == {'2'}
+    assert index.search("cro") == {'3'}
+
+
+def test_every_word_must_match(index):
+    assert index.search("museum louvre") == {'2'}
+    assert index.search("museum marais") == set()
+
+
+def test_accents_and_case_are_ignored(index):
+    assert index.search("CAFE") == {'3'}
+    assert index.search("chéz") == {'1'}
+
+
+def test_longer_words_match_with_one_typo(index):
+    # substituted, missing and extra characters
+    assert index.search("museam") == {'2'}
+    assert index.search("louve") == {'2'}
+    assert index.search("dinnner") == {'1'}
+    # two typos, and short words, must match exactly
+    assert index.search("mssuem") == set()
+    assert index.search("rux") == set()
+
+
+def test_empty_query_matches_everything(index):
+    assert index.search("  ") == {'1', '2', '3'}
+
+
+def test_sync_reindexes_only_what_changed(index):
+    assert index.search("marias") == {'3'}
+
+    index.sync(2, _plans(
+        ('1', "Dinner at Chez Marie", "Montmartre", ""),
+        ('2', "Orsay", "Rue de Lille", "Book the museum tickets"),
+        ('4', "Seine cruise", "Pont Neuf", ""),
+    ))
+
+    assert index.search("louvre") == set()
+    assert index.search("orsay") == {'2'}
+    assert index.search("croissants") == set()
+    assert index.search("cruise") == {'4'}
+    # words of deleted or edited plans no longer fuzzy-match either
+    assert index.search("marias") == set()
+
+
+def test_sync_with_the_same_key_is_skipped(index):
+    index.sync(1, _plans(('9', "Something else", "", "")))
+
+    assert index.search("something") == set()
@@ -0,0 +1,60 @@
+from collections import Counter
+
+import pytest
+
+import streamlit_app as app
+
+
+@pytest.fixture
+def mirrors(sheet, tmp_path):
+    """Synced mirrors of two trips' worksheets in the same spreadsheet"""
+    writes = Counter()
+    connections = [app.SheetConnection({"type": "service_account"}, app.SPREADSHEET_NAME, name,
+                                       creds_key="test", writes=writes) for name in ("Plans", "Plans – B")]
+    mirrors = [app.PlanMirror(connection, tmp_path / "mirror.sqlite3") for connection in connections]
+    for mirror in mirrors:
+        mirror.sync()
+    return mirrors
+
+
+@pytest.fixture
+def watcher():
+    # a long interval keeps the thread asleep; tests run the rounds
+    return app.SheetWatcher(interval=3600)
+
+
+def _round(watcher, sheet, mirrors):
+    sheet.backend.calls.clear()
+    watcher.check(mirrors)
+    return Counter(sheet.backend.calls)
+
+
+def test_quiet_spreadsheet_costs_one_probe(sheet, mirrors, watcher):
+    watcher.check(mirrors)
+
+    assert _round(watcher, sheet, mirrors) == {'get_lastUpdateTime': 1}
+
+
+def test_app_write_to_another_trip_is_not_a_full_read(sheet, mirrors, watcher):
+    watcher.check(mirrors)
+    other = sheet.spreadsheet.worksheet("Plans – B")
+    other.rows.append(["b1", "Hike", "2025-12-20", "09:00", "", "Activity", "", "", 1])
+    mirrors[1].worksheet.bump_version()
+
+    calls = _round(watcher, sheet, mirrors)
+
+    assert calls['get_all_records'] == 0
+    assert calls['get_lastUpdateTime'] == 1
+    assert "b1" in set(mirrors[1].query()['ID'])
+
+
+def test_outside_edit_is_read_in_full(sheet, mirrors, watcher):
+    watcher.check(mirrors)
+    # edited in the spreadsheet: Version stays the same
+    sheet.rows[1][1] = "Renamed in the sheet"
+
+    calls = _round(watcher, sheet, mirrors)
+
+    assert calls['get_lastUpdateTime'] == 1
+    assert calls['get_all_records'] == 2
+    assert "Renamed in the sheet" in set(mirrors[0].query()['Title'])
@@ -0,0 +1,170 @@
+import streamlit_app as app
+
+VERSION = app.PLAN_COLUMNS.index('Version')
+
+
+def _edited(row, title, version):
+    values = list(row)
+    values[1], values[VERSION] = title, version
+    return values
+
+
+def test_update_then_delete_syncs_as_one_delete(sheet, queue):
+    row = list(sheet.rows[1])
+    queue.enqueue('update', row[0], _edited(row, "Changed", 2), base_version=1, base=row)
+    queue.enqueue('delete', row[0], base_version=2)
+
+    queue.sync_once()
+
+    assert queue.pending() == []
+    assert row[0] not in [r[0] for r in sheet.rows]
+    assert queue.status_by_plan() == {row[0]: 'synced'}
+
+
+def test_update_before_conflicting_delete_is_still_written(sheet, queue):
+    row = list(sheet.rows[1])
+    queue.enqueue('update', row[0], _edited(row, "Changed", 2), base_version=1, base=row)
+    # made against a version nobody wrote
+    queue.enqueue('delete', row[0], base_version=5)
+
+    queue.sync_once()
+
+    assert sheet.rows[1][1] == "Changed"
+    assert [(op['kind'], op['status']) for op in queue.pending()] == [('delete', 'conflict')]
+
+
+def test_failed_lookup_backs_off_and_gives_up(sheet, queue, monkeypatch):
+    def offline(*args, **kwargs):
+        raise ConnectionError("network is down")
+
+    monkeypatch.setattr(sheet, 'batch_get', offline)
+    row = list(sheet.rows[1])
+    queue.enqueue('update', row[0], _edited(row, "Changed", 2), base_version=1, base=row)
+
+    for attempt in range(1, app.SYNC_MAX_ATTEMPTS + 1):
+        queue.sync_once()
+        op, = queue.pending()
+        assert op['attempts'] == attempt
+        assert "network is down" in op['error']
+        assert op['next_attempt'] > 0
+        if attempt < app.SYNC_MAX_ATTEMPTS:
+            # still being retried
+            assert queue.status_by_plan() == {row[0]: 'syncing'}
+        # skip the backoff
+        with queue._db() as db:
+            db.execute("UPDATE pending_writes SET next_attempt = 0")
+
+    assert op['status'] == 'failed'
+    assert queue.status_by_plan() == {row[0]: 'failed'}
+
+
+def test_pending_edits_survive_a_new_service_account_key(sheet, queue, tmp_path, monkeypatch):
+    row = list(sheet.rows[1])
+    queue.enqueue('update', row[0], _edited(row, "Changed", 2), base_version=1, base=row)
+    with queue._db() as db:
+        # as queued before the key left out the credentials
+        db.execute("UPDATE pending_writes SET sheet = ?", ("f" * 64 + ":" + queue._key,))
+
+    rotated = app.SheetConnection({"type": "service_account"}, app.SPREADSHEET_NAME, "Plans", creds_key="rotated")
+    reopened = app.WriteBehindQueue(rotated, queue.path)
+
+    assert [op['plan_id'] for op in reopened.pending()] == [row[0]]
+
+
+def _theirs(sheet, **changes):
+    """Change the first plan in the sheet, as another writer would"""
+    for column, value in changes.items():
+        sheet.rows[1][app.PLAN_COLUMNS.index(column)] = value
+
+
+def test_update_against_an_old_version_is_held_as_a_conflict(sheet, queue):
+    row = list(sheet.rows[1])
+    _theirs(sheet, Location="Their place", Version=2)
+    queue.enqueue('update', row[0], _edited(row, "Mine", 2), base_version=1, base=row)
+
+    queue.sync_once()
+
+    op, = queue.pending()
+    assert op['status'] == 'conflict'
+    assert op['remote'] == app._row_text(sheet.rows[1])
+    assert sheet.rows[1][1] == row[1]
+    assert queue.status_by_plan() == {row[0]: 'conflict'}
+
+
+def test_merge_rows_takes_both_sides_changes():
+    base = ['1', 'Dinner', '2025-12-20', '19:00', 'Old place', 'Dining', '', 'c', '1']
+    mine = ['1', 'Late dinner', '2025-12-20', '21:00', 'Old place', 'Dining', '', 'c', '2']
+    theirs = ['1', 'Dinner', '2025-12-20', '19:00', 'New place', 'Dining', 'Book ahead', 'c', '2']
+
+    merged, clashes = app.merge_rows(base, mine, theirs)
+
+    assert merged == ['1', 'Late dinner', '2025-12-20', '21:00', 'New place', 'Dining', 'Book ahead', 'c', '2']
+    assert clashes == []
+
+
+def test_merge_rows_reports_clashes_and_keeps_mine():
+    base = ['1', 'Dinner', '2025-12-20', '19:00', '', 'Dining', '', 'c', '1']
+    mine = ['1', 'Supper', '2025-12-20', '19:00', '', 'Café', '', 'c', '2']
+    theirs = ['1', 'Feast', '2025-12-20', '19:00', '', 'Café', '', 'c', '2']
+
+    merged, clashes = app.merge_rows(base, mine, theirs)
+
+    assert merged[1] == 'Supper'
+    assert merged[5] == 'Café'
+    # both set the same category: not a clash
+    assert clashes == ['Title']
+
+
+def test_rebase_replays_later_updates_on_the_merged_row(sheet, queue):
+    row = list(sheet.rows[1])
+    first = _edited(row, "Mine 1", 2)
+    queue.enqueue('update', row[0], first, base_version=1, base=row)
+    queue.enqueue('update', row[0], _edited(first, "Mine 2", 3), base_version=2, base=first)
+    _theirs(sheet, Location="Their place", Version=5)
+
+    queue.sync_once()
+    conflict, held = queue.pending()
+    assert (conflict['status'], held['status']) == ('conflict', 'pending')
+
+    merged, _ = app.merge_rows(conflict['base'], conflict['values'], conflict['remote'])
+    queue.rebase(conflict['seq'], merged)
+    first, second = queue.pending()
+    assert (first['base_version'], first['values'][VERSION]) == (5, 6)
+    assert (second['base_version'], second['values'][VERSION]) == (6, 7)
+
+    queue.sync_once()
+
+    assert queue.pending() == []
+    assert app._row_text(sheet.rows[1])[1:] == [
+        "Mine 2", row[2], row[3], "Their place", row[5], row[6], row[7], "7"]
+
+
+def test_delete_of_a_changed_plan_can_be_dropped(sheet, queue):
+    row = list(sheet.rows[1])
+    _theirs(sheet, Title="Renamed", Version=2)
+    queue.enqueue('delete', row[0], base_version=1)
+    queue.sync_once()
+    op, = queue.pending()
+    assert op['status'] == 'conflict'
+
+    # "Keep it"
+    queue.drop(op['seq'])
+    queue.sync_once()
+
+    assert queue.pending() == []
+    assert sheet.rows[1][:2] == [row[0], "Renamed"]
+
+
+def test_delete_of_a_changed_plan_can_go_ahead(sheet, queue):
+    row = list(sheet.rows[1])
+    _theirs(sheet, Title="Renamed", Version=2)
+    queue.enqueue('delete', row[0], base_version=1)
+    queue.sync_once()
+    op, = queue.pending()
+
+    # "Delete anyway"
+    queue.rebase(op['seq'])
+    queue.sync_once()
+
+    assert queue.pending() == []
+    assert row[0] not in [r[0] for r in sheet.rows]